@@ -0,0 +1,105 @@
+"""
+Startup cost of a telemetry-only worker.
+
+Each scenario runs in a fresh interpreter (as a batch worker would) and
+reports the import time, the total time, the peak RSS and which heavy
+third-party modules ended up loaded:
+
+    import_sync     import TelemetryVideoSync
+    telemetry       ... + read_telemetry() + load_telemetry() on a synthetic log
+    import_plotter  ... + import PX4CSVPlotter (no plot)
+
+    python benchmarks/imports.py --repeat 5 --out imports.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SIM = os.path.abspath(os.path.join(HERE, "..", "sim"))
+
+from synthetic import make_ulog
+
+HEAVY = ["cv2", "pandas", "matplotlib", "pyulog", "tqdm", "scipy"]
+
+SCENARIOS = {
+    "import_sync": "",
+    "telemetry": """
+sync = TelemetryVideoSync(None, None, None, None, None, ULOG, csv_path=CSV)
+with contextlib.redirect_stdout(io.StringIO()):
+    sync.read_telemetry()
+    track = sync.load_telemetry()
+""",
+    "import_plotter": "from utilities.PX4CSVPlotter import PX4CSVPlotter",
+}
+
+TEMPLATE = """
+import contextlib, io, json, resource, sys, time
+start = time.perf_counter()
+from utilities.TelementryVideoSync import TelemetryVideoSync
+imported = time.perf_counter()
+ULOG, CSV = {ulog!r}, {csv!r}
+{body}
+done = time.perf_counter()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 ** 2 if sys.platform == "darwin" else 1024)
+try:
+    # ru_maxrss can keep the parent's high-water mark across fork + exec
+    with open("/proc/self/status") as f:
+        rss = next(int(l.split()[1]) for l in f if l.startswith("VmHWM")) / 1024
+except OSError:
+    pass
+print(json.dumps({{
+    "import_ms": (imported - start) * 1e3,
+    "total_ms": (done - start) * 1e3,
+    "max_rss_mb": rss,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_scenario(name, ulog_path, csv_dir, repeat):
+    code = TEMPLATE.format(ulog=ulog_path, csv=csv_dir, body=SCENARIOS[name], heavy=HEAVY)
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.check_output([sys.executable, "-c", code], cwd=SIM, text=True)
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+
+    return {
+        "import_ms": float(np.median([r["import_ms"] for r in runs])),
+        "total_ms": float(np.median([r["total_ms"] for r in runs])),
+        "max_rss_mb": float(np.median([r["max_rss_mb"] for r in runs])),
+        "loaded": runs[-1]["loaded"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure worker startup (import time and RSS).")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per scenario (median)")
+    parser.add_argument("--out", default=None, help="optional JSON output")
+    args = parser.parse_args(argv)
+
+    workdir = os.path.join(tempfile.gettempdir(), "airtrace-bench", "imports")
+    os.makedirs(workdir, exist_ok=True)
+    ulog_path = os.path.join(workdir, "log.ulg")
+    if not os.path.exists(ulog_path):
+        # 60 s of telemetry; only frame count / motion window of the video matter here
+        make_ulog(ulog_path, {"fps": 30.0, "frames": 1800, "motion_start": 300, "motion_end": 1500})
+
+    results = {}
+    print(f"{'scenario':<16} {'import ms':>10} {'total ms':>10} {'RSS MB':>8}  loaded")
+    for name in SCENARIOS:
+        r = results[name] = run_scenario(name, ulog_path, os.path.join(workdir, "csv"), args.repeat)
+        print(f"{name:<16} {r['import_ms']:>10.0f} {r['total_ms']:>10.0f} {r['max_rss_mb']:>8.0f}  {', '.join(r['loaded']) or '-'}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
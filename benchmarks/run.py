@@ -0,0 +1,432 @@
+"""
+Offline benchmark of the AirTrace pipeline on synthetic inputs.
+
+For every case (resolution x frame rate) a panning video and a matching
+PX4 log with known ground truth are generated (and reused on later runs),
+then each stage is timed and memory-profiled:
+
+    decode              VideoFrameSource, gray frames
+    decode_parallel     ParallelVideoDecoder.decode (process pool + memmap)
+    motion_energy[_parallel]  serial / ParallelVideoDecoder.motion_energy
+    dense_flow[_parallel]     DenseFlowEngine with 1 / several workers
+    sparse_flow         per-pair sparse_optical_flow loop (reference)
+    sparse_flow_tracker SparseFlowTracker / flow_stream
+    read_telemetry      ULog -> .npy topics
+    plot_all            PX4CSVPlotter.plot_all(plot=True), Agg backend
+    estimate_sync       automatic video/PX4 clock estimate
+    analyze_telemetry   frame alignment
+    export_video        annotated overlay video export
+
+Accuracy is checked against the known truth (flow error, sync error at
+both clip ends, attitude aligned with the estimated clock), so faster
+paths cannot silently lose precision; the parallel stages must match
+their serial counterparts byte for byte. Fixed regression inputs (e.g. a
+short shake for ``MotionDetector``) must reproduce their reference
+result. The report is JSON; ``--compare`` flags stages that got slower
+than a previous report.
+
+    python benchmarks/run.py --out report.json
+    python benchmarks/run.py --quick --compare report.json
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(HERE, "..", "sim")))
+sys.path.append(os.path.abspath(os.path.join(HERE, "..", "ground_testing")))
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from synthetic import make_video, make_ulog, make_shake_video, attitude_profile, altitude_profile
+from utilities.VideoFrameSource import VideoFrameSource
+from utilities.TelementryVideoSync import TelemetryVideoSync
+from utilities.PX4CSVPlotter import PX4CSVPlotter
+from utilities.MotionDetector import MotionDetector
+from utilities.ParallelVideoDecoder import ParallelVideoDecoder
+from optical_flow import sparse_optical_flow, SparseFlowTracker, flow_stream
+from dense_flow import DenseFlowEngine
+
+CASES = {
+    "360p30": dict(width=640, height=360, fps=30.0),
+    "720p30": dict(width=1280, height=720, fps=30.0),
+    "720p60": dict(width=1280, height=720, fps=60.0),
+}
+QUICK_CASES = ["360p30"]
+
+# Process pool size of the parallel stages; dense flow runs on the first
+# DENSE_FRAMES frames at pyramid DENSE_LEVEL, in chunks of DENSE_CHUNK so
+# chunk overlaps are covered
+PARALLEL_WORKERS = 3
+DENSE_FRAMES = 49
+DENSE_CHUNK = 16
+DENSE_LEVEL = 1
+
+# Accuracy limits checked on every run
+LIMITS = {
+    "flow_error_px": 0.1,
+    "sync_error_frames": 1.0,
+    "attitude_error_deg": 0.5,
+    "altitude_error_m": 0.5,
+    # Bytes that differ between the parallel and serial results
+    "parallel_decode_bytes": 0,
+    "parallel_motion_bytes": 0,
+    "parallel_dense_bytes": 0,
+}
+
+
+# ---- measuring ----
+def _rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return rss / 1024 ** 2 if sys.platform == "darwin" else rss / 1024
+
+
+def measure(fn, repeat=1):
+    """
+    Time ``fn`` ``repeat`` times, then run it once more under tracemalloc.
+
+    Returns ``(result, stats)``; ``peak_mb`` counts Python and NumPy
+    allocations, ``max_rss_mb`` is the process high-water mark so far.
+    """
+    runs = []
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        runs.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {
+        "seconds": min(runs),
+        "median": float(np.median(runs)),
+        "runs": runs,
+        "peak_mb": peak / 1024 ** 2,
+        "max_rss_mb": _rss_mb(),
+    }
+
+
+def mismatch(a, b):
+    """Bytes that differ between arrays ``a`` and ``b`` (all of them if shape or dtype differ)."""
+    a, b = np.ascontiguousarray(a), np.ascontiguousarray(b)
+    if a.shape != b.shape or a.dtype != b.dtype:
+        return max(a.nbytes, b.nbytes, 1)
+    return int(np.count_nonzero(a.view(np.uint8) != b.view(np.uint8)))
+
+
+# ---- inputs ----
+def prepare_case(name, params, workdir, seconds):
+    """Generate (or reuse) the video and log of one case."""
+    case_dir = os.path.join(workdir, f"{name}-{seconds:g}s")
+    os.makedirs(case_dir, exist_ok=True)
+    video_path = os.path.join(case_dir, "video.mp4")
+    ulog_path = os.path.join(case_dir, "log.ulg")
+    truth_path = os.path.join(case_dir, "truth.npz")
+
+    if not all(os.path.exists(p) for p in (video_path, ulog_path, truth_path)):
+        video = make_video(video_path, seconds=seconds, **params)
+        log = make_ulog(ulog_path, video)
+        np.savez(truth_path, shift=video["shift"], meta=json.dumps({
+            "video": {k: v for k, v in video.items() if k != "shift"},
+            "log": log,
+        }))
+
+    truth = np.load(truth_path)
+    meta = json.loads(str(truth["meta"]))
+    meta["video"]["shift"] = truth["shift"]
+    return case_dir, video_path, ulog_path, meta
+
+
+# ---- stages ----
+def run_case(name, params, workdir, seconds, repeat):
+    case_dir, video_path, ulog_path, truth = prepare_case(name, params, workdir, seconds)
+    video, log = truth["video"], truth["log"]
+    stages = {}
+    accuracy = {}
+    n_frames = video["frames"]
+
+    def source(color=cv2.COLOR_BGR2GRAY):
+        return VideoFrameSource(video_path, color=color)
+
+    # ---- decode ----
+    def decode():
+        n = 0
+        for _ in source():
+            n += 1
+        return n
+
+    decoded, stages["decode"] = measure(decode, repeat)
+    stages["decode"]["frames_per_second"] = decoded / stages["decode"]["seconds"]
+
+    # ---- parallel paths: must match the serial result byte for byte ----
+    serial = source()
+    gray = serial.to_array()
+    serial_pts = serial.timestamps()
+
+    def decode_parallel():
+        parallel = source()
+        frames = ParallelVideoDecoder(PARALLEL_WORKERS).decode(parallel)
+        return frames, parallel.timestamps()
+
+    (frames, pts), stages["decode_parallel"] = measure(decode_parallel, repeat)
+    stages["decode_parallel"]["frames_per_second"] = len(frames) / stages["decode_parallel"]["seconds"]
+    accuracy["parallel_decode_bytes"] = mismatch(frames, gray) + mismatch(pts, serial_pts)
+
+    def small():
+        # Same input as estimate_sync
+        return VideoFrameSource(video_path, color=cv2.COLOR_BGR2GRAY, target_height=120)
+
+    motion, stages["motion_energy"] = measure(lambda: small().motion_energy(), repeat)
+    motion_parallel, stages["motion_energy_parallel"] = measure(
+        lambda: ParallelVideoDecoder(PARALLEL_WORKERS).motion_energy(small()), repeat
+    )
+    accuracy["parallel_motion_bytes"] = mismatch(motion_parallel, motion)
+
+    dense_input = gray[:DENSE_FRAMES]
+
+    def dense(workers):
+        engine = DenseFlowEngine(workers=workers, level=DENSE_LEVEL, chunk_frames=DENSE_CHUNK)
+        return engine.compute(dense_input, fields=True)
+
+    dense_serial, stages["dense_flow"] = measure(lambda: dense(1), repeat)
+    dense_parallel, stages["dense_flow_parallel"] = measure(lambda: dense(PARALLEL_WORKERS), repeat)
+    accuracy["parallel_dense_bytes"] = sum(
+        mismatch(dense_parallel[key], dense_serial[key]) for key in dense_serial
+    ) + (set(dense_parallel) != set(dense_serial))
+
+    # ---- sparse flow: reference loop and tracker ----
+    shift = np.asarray(video["shift"])
+    moving = slice(video["motion_start"] + 1, video["motion_end"])
+
+    def sparse_reference():
+        motion = []
+        prev = None
+        for gray in source():
+            if prev is not None:
+                dx, dy, _ = sparse_optical_flow(prev, gray)
+                motion.append((dx, dy))
+            prev = gray
+        return np.array(motion)
+
+    def sparse_tracker():
+        return np.array(list(flow_stream(source(), SparseFlowTracker())))
+
+    for stage, fn in (("sparse_flow", sparse_reference), ("sparse_flow_tracker", sparse_tracker)):
+        motion, stages[stage] = measure(fn, repeat)
+        stages[stage]["frames_per_second"] = len(motion) / stages[stage]["seconds"]
+        # motion[i] is the shift from frame i to frame i + 1
+        error = np.abs(motion[moving.start - 1:moving.stop - 1] - shift[moving])
+        accuracy[f"{stage}_error_px"] = float(error.mean())
+
+    # ---- telemetry ----
+    csv_dir = os.path.join(case_dir, "csv")
+
+    def new_sync():
+        return TelemetryVideoSync(None, None, None, None, video_path, ulog_path, csv_path=csv_dir)
+
+    _, stages["read_telemetry"] = measure(lambda: new_sync().read_telemetry(), repeat)
+
+    def plot_all():
+        PX4CSVPlotter(csv_dir).plot_all(plot=True)
+        plt.close("all")
+
+    _, stages["plot_all"] = measure(plot_all, repeat)
+
+    def estimate():
+        sync = new_sync()
+        sync.estimate_sync()
+        return sync.time_offset, sync.time_scale
+
+    (offset, scale), stages["estimate_sync"] = measure(estimate, repeat)
+    accuracy["sync_offset_s"] = offset
+    accuracy["sync_scale"] = scale
+    # The true mapping is log time = offset + video time; a wrong scale shows
+    # up at the far end of the clip, so keep the worse of both ends
+    ends = np.array([0.0, n_frames / video["fps"]])
+    error = np.abs(offset + scale * ends - (log["offset"] + ends))
+    accuracy["sync_error_frames"] = float(error.max() * video["fps"])
+
+    def analyze():
+        # Align with the estimated clock so sync errors reach the attitude check
+        sync = new_sync()
+        sync.time_offset = offset
+        sync.time_scale = scale
+        sync.analyze_telemetry()
+        return sync
+
+    sync, stages["analyze_telemetry"] = measure(analyze, repeat)
+    # Truth at the frames' true log time, not at the estimated one
+    true_time = log["offset"] + sync.video_time
+    roll, pitch, yaw = attitude_profile(true_time)
+    accuracy["attitude_error_deg"] = float(max(
+        np.abs(sync.roll - roll).max(),
+        np.abs(sync.pitch - pitch).max(),
+        np.abs((sync.yaw - yaw + 180) % 360 - 180).max(),
+    ))
+    accuracy["altitude_error_m"] = float(np.abs(sync.gps_alt - altitude_profile(true_time)).max())
+
+    # ---- export ----
+    output = os.path.join(case_dir, "output.mp4")
+    _, stages["export_video"] = measure(lambda: sync.export_telemetry_video(output), repeat)
+    stages["export_video"]["frames_per_second"] = n_frames / stages["export_video"]["seconds"]
+
+    return {
+        "params": dict(params, seconds=seconds, frames=n_frames),
+        "stages": stages,
+        "accuracy": accuracy,
+    }
+
+
+# ---- report ----
+def checks(cases):
+    results = []
+    for name, case in cases.items():
+        acc = case["accuracy"]
+        values = {
+            "flow_error_px": acc["sparse_flow_tracker_error_px"],
+            "sync_error_frames": acc["sync_error_frames"],
+            "attitude_error_deg": acc["attitude_error_deg"],
+            "altitude_error_m": acc["altitude_error_m"],
+            "parallel_decode_bytes": acc["parallel_decode_bytes"],
+            "parallel_motion_bytes": acc["parallel_motion_bytes"],
+            "parallel_dense_bytes": acc["parallel_dense_bytes"],
+        }
+        for key, value in values.items():
+            results.append({
+                "case": name,
+                "check": key,
+                "value": value,
+                "limit": LIMITS[key],
+                "ok": bool(value <= LIMITS[key]),
+            })
+    return results
+
+
+def regressions(workdir):
+    """Fixed inputs that once broke a fast path; each must match its reference result."""
+    results = []
+
+    # Short shake: the coarse end scan used to step over it and crash
+    path = os.path.join(workdir, "shake.avi")
+    truth = make_shake_video(path)
+    start, end, _ = MotionDetector(path).detect()
+    expected = (truth["start"], truth["last_moving"] + 2)
+    results.append({
+        "case": "regression",
+        "check": "motion_detect_short_shake",
+        "value": [int(start), int(end)],
+        "limit": list(expected),
+        "ok": (start, end) == expected,
+    })
+    return results
+
+
+def environment():
+    def git(*args):
+        try:
+            return subprocess.check_output(["git", *args], cwd=HERE, stderr=subprocess.DEVNULL, text=True).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(report, baseline, threshold):
+    """Print per-stage time ratios against ``baseline``; returns the regressions."""
+    regressions = []
+    print(f"\n{'case':<10} {'stage':<22} {'before':>9} {'after':>9} {'ratio':>7}")
+    for name, case in report["cases"].items():
+        old_case = baseline["cases"].get(name)
+        if old_case is None:
+            continue
+        for stage, stats in case["stages"].items():
+            old = old_case["stages"].get(stage)
+            if old is None:
+                continue
+            ratio = stats["seconds"] / old["seconds"] if old["seconds"] > 0 else float("inf")
+            flag = "  <-- slower" if ratio > threshold else ""
+            print(f"{name:<10} {stage:<22} {old['seconds']:9.3f} {stats['seconds']:9.3f} {ratio:7.2f}{flag}")
+            if ratio > threshold:
+                regressions.append({"case": name, "stage": stage, "ratio": ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the AirTrace pipeline on synthetic data.")
+    parser.add_argument("--out", default="benchmark_report.json", help="JSON report path")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), help="cases to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help="smallest case, short clip, one run per stage")
+    parser.add_argument("--seconds", type=float, default=None, help="clip length (default 20, quick 8)")
+    parser.add_argument("--repeat", type=int, default=None, help="timed runs per stage (default 3, quick 1)")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "airtrace-bench"),
+                        help="where generated inputs are kept between runs")
+    parser.add_argument("--compare", default=None, help="previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    names = args.cases or (QUICK_CASES if args.quick else list(CASES))
+    seconds = args.seconds or (8.0 if args.quick else 20.0)
+    repeat = args.repeat or (1 if args.quick else 3)
+    os.makedirs(args.workdir, exist_ok=True)
+
+    cases = {}
+    for name in names:
+        print(f"[{name}] running ...")
+        cases[name] = run_case(name, CASES[name], args.workdir, seconds, repeat)
+        for stage, stats in cases[name]["stages"].items():
+            print(f"  {stage:<22} {stats['seconds']:8.3f}s  peak {stats['peak_mb']:8.1f} MB")
+
+    report = {
+        "environment": environment(),
+        "limits": LIMITS,
+        "cases": cases,
+        "checks": checks(cases) + regressions(args.workdir),
+    }
+    failed = [c for c in report["checks"] if not c["ok"]]
+    for c in failed:
+        print(f"[accuracy] {c['case']} {c['check']} = {c['value']} (limit {c['limit']})")
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare(report, json.load(f), args.threshold)
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,277 @@
+"""
+Synthetic inputs with known ground truth for the benchmarks.
+
+``make_video`` pans a camera over a random texture (still - moving - still)
+so every frame's displacement and the motion window are known exactly.
+``make_ulog`` writes a PX4 ULog whose attitude, IMU and GPS follow closed
+form profiles; the IMU is active exactly while the video moves, shifted by
+a known clock offset, so sync and alignment can be checked against truth.
+"""
+import struct
+
+import cv2
+import numpy as np
+
+
+# ---- video ----
+def _texture(height, width, seed):
+    """Smooth random RGB texture with enough detail for corner tracking."""
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(0, 256, (height // 16 + 2, width // 16 + 2, 3), dtype=np.uint8)
+    texture = cv2.resize(coarse, (width, height), interpolation=cv2.INTER_CUBIC).astype(np.int16)
+    texture += rng.integers(-40, 41, (height, width, 3), dtype=np.int16)
+    return np.clip(texture, 0, 255).astype(np.uint8)
+
+
+def make_video(
+    path,
+    width=640,
+    height=360,
+    fps=30.0,
+    seconds=10.0,
+    speed=(1.5, 3.0),
+    still=(2.0, 2.0),
+    seed=0,
+    fourcc="mp4v"
+):
+    """
+    Write a panning video and return its ground truth.
+
+    The image is static for ``still[0]`` seconds, then content moves by
+    ``speed`` = ``(dx, dy)`` pixels per frame, then it is static for the
+    last ``still[1]`` seconds. Returns a dict with ``fps``, ``frames``,
+    per-frame ``shift`` (content displacement from frame ``i - 1`` to
+    ``i``, ``(n, 2)``) and the ``motion_start``/``motion_end`` frames.
+    """
+    n = int(round(seconds * fps))
+    start = int(round(still[0] * fps))
+    end = n - int(round(still[1] * fps))
+    vx, vy = speed
+
+    # Crop origin per frame: moving the crop by -v moves the content by +v
+    steps = np.zeros(n)
+    steps[start:end] = 1.0
+    travel = np.cumsum(steps)
+    margin = 8
+    ox = abs(vx) * (end - start) + margin - vx * travel if vx >= 0 else margin - vx * travel
+    oy = abs(vy) * (end - start) + margin - vy * travel if vy >= 0 else margin - vy * travel
+
+    tex_w = int(np.ceil(width + ox.max() + margin))
+    tex_h = int(np.ceil(height + oy.max() + margin))
+    texture = _texture(tex_h, tex_w, seed)
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+    if not writer.isOpened():
+        raise IOError(f"Cannot open video writer: {path}")
+    try:
+        for i in range(n):
+            M = np.float32([[1, 0, ox[i]], [0, 1, oy[i]]])
+            frame = cv2.warpAffine(
+                texture, M, (width, height),
+                flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP
+            )
+            writer.write(frame)
+    finally:
+        writer.release()
+
+    shift = np.zeros((n, 2))
+    shift[1:, 0] = -np.diff(ox)
+    shift[1:, 1] = -np.diff(oy)
+    return {
+        "fps": fps,
+        "frames": n,
+        "width": width,
+        "height": height,
+        "speed": [vx, vy],
+        "shift": shift,
+        # first frame that differs from its predecessor / last one that does
+        "motion_start": start,
+        "motion_end": end - 1,
+    }
+
+
+def make_shake_video(path, width=320, height=240, fps=30.0, frames=240, shake=(100, 105), shift=5, seed=0):
+    """
+    Lossless (FFV1) static clip whose frames ``shake[0]..shake[1]`` are shifted by ``shift`` px.
+
+    Only the pairs entering and leaving the shake differ, so the exhaustive
+    motion scan gives ``start = shake[0] - 1`` and last moving pair
+    ``shake[1]``. Returns that truth.
+    """
+    texture = _texture(height, width + shift, seed)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"FFV1"), fps, (width, height))
+    if not writer.isOpened():
+        raise IOError(f"Cannot open video writer: {path}")
+    try:
+        for i in range(frames):
+            dx = shift if shake[0] <= i <= shake[1] else 0
+            writer.write(np.ascontiguousarray(texture[:, dx:dx + width]))
+    finally:
+        writer.release()
+
+    return {"fps": fps, "frames": frames, "start": shake[0] - 1, "last_moving": shake[1]}
+
+
+# ---- ULog ----
+_ULOG_TYPES = {
+    "uint64_t": "<u8",
+    "int32_t": "<i4",
+    "uint32_t": "<u4",
+    "uint8_t": "u1",
+    "float": "<f4",
+    "double": "<f8",
+}
+
+
+def _message(kind, payload):
+    return struct.pack("<HB", len(payload), ord(kind)) + payload
+
+
+def write_ulog(path, topics):
+    """
+    Minimal ULog writer.
+
+    ``topics`` is a list of ``(name, multi_id, fields, data)`` where
+    ``fields`` is ``[(type, field), ...]`` (``uint64_t timestamp`` first)
+    and ``data`` maps field -> array; array fields such as ``q[4]`` are
+    given as ``("float", "q", 4)`` with ``data["q"]`` of shape ``(n, 4)``.
+    Data messages are packed per topic with one structured array.
+    """
+    out = bytearray(b"ULog\x01\x12\x35" + bytes([1]) + struct.pack("<Q", 0))
+    # Flag bits: no compat/incompat flags, no appended data
+    out += _message("B", bytes(16) + struct.pack("<3Q", 0, 0, 0))
+
+    defined = set()
+    for name, _, fields, _ in topics:
+        if name in defined:
+            continue
+        spec = "".join(
+            f"{f[0]}[{f[2]}] {f[1]};" if len(f) > 2 else f"{f[0]} {f[1]};"
+            for f in fields
+        )
+        out += _message("F", f"{name}:{spec}".encode())
+        defined.add(name)
+
+    for msg_id, (name, multi_id, _, _) in enumerate(topics):
+        out += _message("A", struct.pack("<BH", multi_id, msg_id) + name.encode())
+
+    for msg_id, (name, multi_id, fields, data) in enumerate(topics):
+        n = len(data["timestamp"])
+        columns = [(f[1], _ULOG_TYPES[f[0]], (f[2],)) if len(f) > 2 else (f[1], _ULOG_TYPES[f[0]]) for f in fields]
+        payload = np.dtype([("msg_id", "<u2")] + columns)
+        rows = np.zeros(n, dtype=[("size", "<u2"), ("kind", "u1"), ("body", payload)])
+        rows["size"] = payload.itemsize
+        rows["kind"] = ord("D")
+        rows["body"]["msg_id"] = msg_id
+        for f in fields:
+            rows["body"][f[1]] = data[f[1]]
+        out += rows.tobytes()
+
+    with open(path, "wb") as f:
+        f.write(bytes(out))
+
+
+def euler_to_quat(roll, pitch, yaw):
+    """ZYX Euler angles (degrees) -> PX4 ``q[0..3]`` (w, x, y, z), ``(n, 4)``."""
+    r, p, y = (np.deg2rad(np.asarray(a, dtype=np.float64)) / 2 for a in (roll, pitch, yaw))
+    cr, sr = np.cos(r), np.sin(r)
+    cp, sp = np.cos(p), np.sin(p)
+    cy, sy = np.cos(y), np.sin(y)
+    return np.column_stack([
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy,
+    ])
+
+
+def attitude_profile(t):
+    """Known attitude (degrees) at PX4 times ``t``: slow roll/pitch sines and a turning yaw."""
+    t = np.asarray(t, dtype=np.float64)
+    roll = 10 * np.sin(2 * np.pi * t / 20)
+    pitch = 5 * np.sin(2 * np.pi * t / 15 + 1)
+    yaw = (20 * t) % 360 - 180
+    return roll, pitch, yaw
+
+
+def altitude_profile(t):
+    t = np.asarray(t, dtype=np.float64)
+    return 120 + 15 * np.sin(2 * np.pi * t / 30)
+
+
+def make_ulog(path, video, offset=25.0, lead=10.0, tail=10.0, imu_rate=200.0, att_rate=100.0, gps_rate=10.0, seed=0):
+    """
+    Write a ULog matching ``video`` (ground truth from ``make_video``).
+
+    Video time ``v`` corresponds to PX4 time ``offset + v``; the log
+    covers ``lead`` s before the video and ``tail`` s after it. Attitude
+    follows ``attitude_profile`` and GPS altitude ``altitude_profile``;
+    gyro and accel show a burst exactly during the video motion window.
+    Returns the truth dict (``offset``, covered time range, rates).
+    """
+    rng = np.random.default_rng(seed)
+    duration = video["frames"] / video["fps"]
+    t0 = max(offset - lead, 0.0)
+    t1 = offset + duration + tail
+
+    def axis(rate):
+        t = np.arange(t0, t1, 1.0 / rate)
+        return t, (t * 1e6).astype(np.uint64)
+
+    # ---- attitude ----
+    t_att, ts_att = axis(att_rate)
+    q = euler_to_quat(*attitude_profile(t_att))
+
+    # ---- IMU: attitude rates plus a burst while the video moves ----
+    t_imu, ts_imu = axis(imu_rate)
+    move_t0 = offset + video["motion_start"] / video["fps"]
+    move_t1 = offset + (video["motion_end"] + 1) / video["fps"]
+    moving = (t_imu >= move_t0) & (t_imu < move_t1)
+    burst = np.where(moving, 2.0, 0.0)
+
+    roll, pitch, yaw = attitude_profile(t_imu)
+    gyro = np.column_stack([
+        np.deg2rad(np.gradient(roll, t_imu)) + burst,
+        np.deg2rad(np.gradient(pitch, t_imu)) + 0.5 * burst,
+        np.deg2rad(np.gradient(np.unwrap(yaw, period=360), t_imu)),
+    ]) + rng.normal(0, 0.01, (len(t_imu), 3))
+    accel = np.column_stack([
+        rng.normal(0, 0.05, len(t_imu)) + burst,
+        rng.normal(0, 0.05, len(t_imu)),
+        rng.normal(-9.81, 0.05, len(t_imu)),
+    ])
+
+    # ---- mag / baro / GPS ----
+    t_mag, ts_mag = axis(50.0)
+    heading = np.deg2rad(attitude_profile(t_mag)[2])
+    t_gps, ts_gps = axis(gps_rate)
+    alt = altitude_profile(t_gps)
+
+    xyz = [("uint64_t", "timestamp"), ("float", "x"), ("float", "y"), ("float", "z")]
+    topics = [
+        ("vehicle_attitude", 0, [("uint64_t", "timestamp"), ("float", "q", 4)],
+         {"timestamp": ts_att, "q": q}),
+        ("sensor_gyro", 0, xyz,
+         {"timestamp": ts_imu, "x": gyro[:, 0], "y": gyro[:, 1], "z": gyro[:, 2]}),
+        ("sensor_accel", 0, xyz,
+         {"timestamp": ts_imu, "x": accel[:, 0], "y": accel[:, 1], "z": accel[:, 2]}),
+        ("sensor_mag", 0, xyz,
+         {"timestamp": ts_mag, "x": 0.2 * np.cos(heading), "y": 0.2 * np.sin(heading), "z": np.full(len(t_mag), 0.4)}),
+        ("sensor_baro", 0, [("uint64_t", "timestamp"), ("float", "pressure"), ("float", "temperature")],
+         {"timestamp": ts_gps, "pressure": 101325 - 12 * alt, "temperature": np.full(len(t_gps), 20.0)}),
+        ("sensor_gps", 0, [("uint64_t", "timestamp"), ("double", "longitude_deg"), ("double", "latitude_deg"),
+                           ("float", "altitude_msl_m")],
+         {"timestamp": ts_gps, "longitude_deg": 19.9 + 1e-5 * t_gps, "latitude_deg": 50.0 + 5e-6 * t_gps,
+          "altitude_msl_m": alt}),
+    ]
+    write_ulog(path, topics)
+
+    return {
+        "offset": offset,
+        "start": t0,
+        "stop": t1,
+        "imu_rate": imu_rate,
+        "att_rate": att_rate,
+        "gps_rate": gps_rate,
+        "samples": int(sum(len(d["timestamp"]) for _, _, _, d in topics)),
+    }
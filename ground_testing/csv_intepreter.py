@@ -1,16 +1,24 @@
 #%%
-import pandas as pd
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 
-csv_file = "G:/projekt gropwy/22.10.2025/csv/5.2.csv"
-df = pd.read_csv(csv_file, sep=";", decimal=",", header=0)
+from dead_reckoning import dead_reckon, OnlineDeadReckoning
+from sensor_csv import SensorCSVLoader
 
+sys.path.append(os.path.abspath("../sim"))
+from utilities.LineDecimator import LineDecimator
 
-df['time'] = pd.to_numeric(df['time'], errors='coerce')
-for col in ['ax','ay','az','wx','wy','wz','Bx','By','Bz','Azimuth','Pitch','Roll',
-            'Latitude','Longitude','Speed (m/s)','Altitude (m)']:
-    df[col] = pd.to_numeric(df[col], errors='coerce')
+csv_file = "G:/projekt gropwy/22.10.2025/csv/5.2.csv"
+decimation = "minmax"  # time plots: "minmax", "lttb" or None (every sample); re-decimated on zoom
+max_arrows = 300  # quiver arrows in the 3D plot
+quiver_stride = None  # fixed row step for the arrows (None = derived from max_arrows)
+
+# Pomijamy pierwszy wiersz i bierzemy co 10. - pominięte wiersze nie są w ogóle parsowane
+# (wynik jest cache'owany w ~/.cache/airtrace/sensor_csv)
+df = SensorCSVLoader().read(csv_file, skip=1, every=10)
 
 hysteresis = 0.04  # m/s^2
 
@@ -18,10 +26,6 @@ hysteresis = 0.04  # m/s^2
 for col in ['ax', 'ay', 'az']:
     df[col + '_filtered'] = df[col].where(df[col].abs() >= hysteresis, 0)
 
-# Pomijamy pierwsze 10 wierszy
-df = df[1:].copy()
-df = df[::10].copy()
-
 # Wybieramy punkt odniesienia (np. pierwszy punkt)
 lat0 = df['Latitude'].iloc[0]
 lon0 = df['Longitude'].iloc[0]
@@ -45,8 +49,14 @@ len(df)
 #%%
 
 
+def plot_series(ax, x, y, **kwargs):
+    if decimation is None:
+        return ax.plot(x, y, **kwargs)[0]
+    return LineDecimator(decimation).plot(ax, np.asarray(x), np.asarray(y), **kwargs)
+
+
 plt.figure(figsize=(12,6))
-plt.plot(df['time'], df['Azimuth'], label='Azimuth', color='tab:blue')
+plot_series(plt.gca(), df['time'], df['Azimuth'], label='Azimuth', color='tab:blue')
 plt.xlabel('Time [s]')
 plt.ylabel('Azimuth [°]')
 plt.title('Azimuth over Time')
@@ -74,8 +84,8 @@ df['sin_az'] = np.sin(theta)
 
 # --- Plot both over time ---
 plt.figure(figsize=(12,6))
-plt.plot(df['time'], df['cos_az'], label='cos(Azimuth)', color='tab:blue')
-plt.plot(df['time'], df['sin_az'], label='sin(Azimuth)', color='tab:orange')
+plot_series(plt.gca(), df['time'], df['cos_az'], label='cos(Azimuth)', color='tab:blue')
+plot_series(plt.gca(), df['time'], df['sin_az'], label='sin(Azimuth)', color='tab:orange')
 plt.xlabel('Time [s]')
 plt.ylabel('Value')
 plt.title('Cosine and Sine of Azimuth over Time')
@@ -119,10 +129,11 @@ ax.plot(
     label='Heading (cos/sin)'
 )
 
-# Plot acceleration vectors (as arrows or lines)
+# Plot acceleration vectors (as arrows or lines), every stride-th row only
+arrows = df.iloc[::LineDecimator.stride(len(df), max_arrows, quiver_stride)]
 ax.quiver(
-    df['cos_az'], df['sin_az'], df['time'],     # base points
-    df['ax_scaled'], df['ay_scaled'], np.zeros_like(df['time']),  # direction (no vertical)
+    arrows['cos_az'], arrows['sin_az'], arrows['time'],     # base points
+    arrows['ax_scaled'], arrows['ay_scaled'], np.zeros(len(arrows)),  # direction (no vertical)
     length=1.0, normalize=False, color='tab:red', alpha=0.7, label='Acceleration'
 )
 
@@ -135,6 +146,68 @@ ax.legend()
 ax.set_box_aspect([1,1,0.5])
 plt.show()
 
+#%%
+# --- Dead reckoning: body accelerations -> ENU velocity/position ---
+imu = df[['time', 'ax', 'ay', 'az', 'Azimuth', 'Pitch', 'Roll']].dropna().sort_values('time')
+t = imu['time'].to_numpy()
+
+dr = dead_reckon(
+    t,
+    imu[['ax', 'ay', 'az']].to_numpy(),
+    imu['Azimuth'].to_numpy(), imu['Pitch'].to_numpy(), imu['Roll'].to_numpy(),
+    cutoff=1.0, order=3
+)
+
+plt.figure(figsize=(8,8))
+plt.plot(dr['pos'][:, 0], dr['pos'][:, 1], label='Dead reckoning [m]')
+plt.plot(df['x'], df['y'], label='GPS [m]', alpha=0.6)
+plt.xlabel('East [m]')
+plt.ylabel('North [m]')
+plt.title('Dead reckoning vs GPS')
+plt.grid(True)
+plt.axis('equal')
+plt.legend()
+plt.show()
+
+#%%
+# --- Online dead reckoning: same pipeline chunk by chunk (live during a test) ---
+online = OnlineDeadReckoning(cutoff=1.0, order=3, hysteresis=hysteresis, smoothing_lag=2.0)
+track = []
+
+cols = ['time', 'ax', 'ay', 'az', 'Azimuth', 'Pitch', 'Roll']
+loader = SensorCSVLoader()
+
+# Bias/gravity from the rest period at the start (the batch cell removes the mean instead)
+rest_seconds = 2.0
+first = next(loader.iter_chunks(csv_file, columns=cols, skip=1, every=10, chunksize=5000)).dropna()
+rest = first[first['time'] < first['time'].iloc[0] + rest_seconds]
+bias = online.calibrate(
+    rest[['ax', 'ay', 'az']].to_numpy(),
+    rest['Azimuth'].to_numpy(), rest['Pitch'].to_numpy(), rest['Roll'].to_numpy()
+)
+print("Calibrated bias E/N/U:", bias)
+
+for chunk in loader.iter_chunks(csv_file, columns=cols, skip=1, every=10, chunksize=5000):
+    chunk = chunk.dropna()
+    out = online.update(
+        chunk['time'].to_numpy(), chunk[['ax', 'ay', 'az']].to_numpy(),
+        chunk['Azimuth'].to_numpy(), chunk['Pitch'].to_numpy(), chunk['Roll'].to_numpy()
+    )
+    track.append(out['pos'])
+    print(f"t={chunk['time'].iloc[-1]:.1f}s  pos E/N = {online.pos[0]:.2f} / {online.pos[1]:.2f} m")
+
+track.append(online.flush()['pos'])
+track = np.concatenate(track)
+
+plt.figure(figsize=(8,8))
+plt.plot(track[:, 0], track[:, 1], label='Online dead reckoning [m]')
+plt.xlabel('East [m]')
+plt.ylabel('North [m]')
+plt.grid(True)
+plt.axis('equal')
+plt.legend()
+plt.show()
+
 #%%
 
 #%%
@@ -0,0 +1,272 @@
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfilt_zi, sosfiltfilt
+
+
+# ---- integration ----
+def integrate_trapz_adaptive(y, t, initial=0.0):
+    """
+    Cumulative trapezoidal integral of ``y`` over irregular timestamps ``t``.
+
+    ``y`` is ``(n,)`` or ``(n, k)`` (every column integrated at once). The
+    sum is accumulated in float64 and returned in the dtype of ``y``, so
+    float32 inputs stay float32 without drifting over long logs.
+    """
+    y = np.asarray(y)
+    t = np.asarray(t, dtype=np.float64)
+    dtype = y.dtype if np.issubdtype(y.dtype, np.floating) else np.float64
+
+    out = np.empty(y.shape, dtype=np.float64)
+    if len(y) == 0:
+        return out.astype(dtype, copy=False)
+
+    dt = np.diff(t)
+    if y.ndim > 1:
+        dt = dt.reshape((-1,) + (1,) * (y.ndim - 1))
+
+    out[0] = initial
+    np.cumsum(0.5 * (y[1:] + y[:-1]) * dt, axis=0, out=out[1:])
+    out[1:] += initial
+    return out.astype(dtype, copy=False)
+
+
+# ---- rotation ----
+def body_to_enu(acc, yaw, pitch, roll):
+    """
+    Rotate body-frame accelerations into the ground frame for all samples.
+
+    ``acc`` is ``(n, 3)``; ``yaw``/``pitch``/``roll`` are in degrees (the
+    phone's ``Azimuth``/``Pitch``/``Roll`` columns). Uses the same ZYX
+    matrix as ``csv.ipynb``; the rows are returned as ``(east, north, up)``
+    columns of an ``(n, 3)`` array.
+    """
+    acc = np.asarray(acc)
+    dtype = acc.dtype if np.issubdtype(acc.dtype, np.floating) else np.float64
+    psi, theta, phi = (np.deg2rad(np.asarray(a, dtype=dtype)) for a in (yaw, pitch, roll))
+
+    cps, sps = np.cos(psi), np.sin(psi)
+    cth, sth = np.cos(theta), np.sin(theta)
+    cph, sph = np.cos(phi), np.sin(phi)
+    ax, ay, az = acc[:, 0], acc[:, 1], acc[:, 2]
+
+    out = np.empty((len(acc), 3), dtype=dtype)
+    out[:, 0] = cth * cps * ax + (sph * sth * cps - cph * sps) * ay + (cph * sth * cps + sph * sps) * az
+    out[:, 1] = cth * sps * ax + (sph * sth * sps + cph * cps) * ay + (cph * sth * sps - sph * cps) * az
+    out[:, 2] = -sth * ax + sph * cth * ay + cph * cth * az
+    return out
+
+
+# ---- filtering ----
+def sample_rate(t):
+    return 1.0 / np.mean(np.diff(np.asarray(t, dtype=np.float64)))
+
+
+def butter_lowpass_sos(cutoff, fs, order=4):
+    nyquist = 0.5 * fs
+    return butter(order, cutoff / nyquist, btype="low", output="sos")
+
+
+def butter_lowpass_filter(data, cutoff, fs, order=4, axis=0):
+    """Zero-phase low-pass (second-order sections, stable at high orders / low cutoffs)."""
+    data = np.asarray(data)
+    filtered = sosfiltfilt(butter_lowpass_sos(cutoff, fs, order), data, axis=axis)
+    return filtered.astype(data.dtype, copy=False) if np.issubdtype(data.dtype, np.floating) else filtered
+
+
+# ---- pipeline ----
+def dead_reckon(t, acc, yaw, pitch, roll, cutoff=None, order=3, remove_mean=True):
+    """
+    Acceleration -> velocity -> position in the ground frame.
+
+    ``t`` in seconds (sorted), ``acc`` ``(n, 3)`` body-frame accelerations,
+    angles in degrees. Optionally low-passes the ground-frame acceleration
+    at ``cutoff`` Hz and removes its mean (bias/gravity) before the two
+    integrations. Returns a dict of ``(n, 3)`` arrays ``acc``, ``vel`` and
+    ``pos`` with ``(east, north, up)`` columns.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    a = body_to_enu(acc, yaw, pitch, roll)
+
+    if cutoff is not None:
+        a = butter_lowpass_filter(a, cutoff, sample_rate(t), order)
+    if remove_mean:
+        a = a - a.mean(axis=0)
+
+    vel = integrate_trapz_adaptive(a, t)
+    pos = integrate_trapz_adaptive(vel, t)
+    return {"acc": a, "vel": vel, "pos": pos}
+
+
+class OnlineDeadReckoning:
+    """
+    Incremental version of ``dead_reckon`` for live sensor streams.
+
+    Every ``update`` call costs O(chunk): the causal SOS low-pass keeps its
+    ``zi`` state between chunks, the hysteresis keeps which axes are
+    "moving", and the integrators keep the last acceleration, velocity and
+    position. With ``smoothing_lag`` (seconds) the output is delayed by
+    that much and a backward pass over the last ``smoothing_lag`` seconds
+    approximates the zero-phase ``sosfiltfilt`` result.
+
+    Hysteresis: an axis turns on once ``|a| >= hysteresis`` and stays on
+    until ``|a| < release`` (``release=None`` is the plain dead band used in
+    ``csv_intepreter.py``); axes that are off contribute zero acceleration.
+    ``bias`` (ground frame, e.g. gravity) is subtracted after filtering and
+    can be estimated from a rest period with ``calibrate``.
+    """
+
+    def __init__(
+        self,
+        cutoff=None,
+        fs=None,
+        order=3,
+        hysteresis=0.0,
+        release=None,
+        smoothing_lag=None,
+        bias=None
+    ):
+        self.cutoff = cutoff
+        self.fs = fs
+        self.order = order
+        self.hysteresis = hysteresis
+        self.release = hysteresis if release is None else release
+        self.smoothing_lag = smoothing_lag
+        self.bias = np.zeros(3) if bias is None else np.asarray(bias, dtype=np.float64)
+
+        self.sos = None
+        self._zi = None
+        self._active = np.zeros(3, dtype=bool)
+
+        # Causally filtered samples waiting for the smoother: times and values
+        self._pending_t = np.empty(0)
+        self._pending_a = np.empty((0, 3))
+
+        self._last_t = None
+        self._last_a = None
+        self.vel = np.zeros(3)
+        self.pos = np.zeros(3)
+
+    # ---- setup ----
+    def _init_filter(self, t, a):
+        if self.cutoff is None:
+            return
+        if self.fs is None:
+            if len(t) < 2:
+                return
+            self.fs = sample_rate(t)
+        self.sos = butter_lowpass_sos(self.cutoff, self.fs, self.order)
+        # Start in steady state at the first sample (no start-up transient)
+        self._zi = sosfilt_zi(self.sos)[:, :, None] * a[0]
+
+    def calibrate(self, acc, yaw, pitch, roll):
+        """Set ``bias`` to the mean ground-frame acceleration of a rest period."""
+        self.bias = body_to_enu(acc, yaw, pitch, roll).astype(np.float64).mean(axis=0)
+        return self.bias
+
+    # ---- stages ----
+    def _filter(self, t, a):
+        if self.cutoff is None:
+            return a
+        if self.sos is None:
+            self._init_filter(t, a)
+            if self.sos is None:
+                return a
+        y, self._zi = sosfilt(self.sos, a, axis=0, zi=self._zi)
+        return y
+
+    def _smooth(self, t, a):
+        """Delay by ``smoothing_lag`` and run a backward pass over the lag window."""
+        if self.smoothing_lag is None or self.sos is None:
+            return t, a
+
+        self._pending_t = np.concatenate([self._pending_t, t])
+        self._pending_a = np.concatenate([self._pending_a, a])
+        if len(self._pending_t) == 0:
+            return t[:0], a[:0]
+
+        ready = self._pending_t <= self._pending_t[-1] - self.smoothing_lag
+        n = int(ready.sum())
+        if n == 0:
+            return t[:0], a[:0]
+
+        # Backward filter from the newest sample, started in steady state
+        rev = self._pending_a[::-1]
+        zi = sosfilt_zi(self.sos)[:, :, None] * rev[0]
+        smoothed = sosfilt(self.sos, rev, axis=0, zi=zi)[0][::-1]
+
+        out_t, out_a = self._pending_t[:n], smoothed[:n]
+        self._pending_t = self._pending_t[n:]
+        self._pending_a = self._pending_a[n:]
+        return out_t, out_a
+
+    def _apply_hysteresis(self, a):
+        if self.hysteresis <= 0:
+            return a
+        mag = np.abs(a)
+
+        # Each sample either switches an axis on, off, or keeps the last state:
+        # forward-fill the index of the latest switching sample
+        events = np.where(mag >= self.hysteresis, 1, np.where(mag < self.release, 0, -1))
+        rows = np.arange(len(a))[:, None]
+        last = np.maximum.accumulate(np.where(events >= 0, rows, -1), axis=0)
+        switched = np.take_along_axis(events, np.maximum(last, 0), axis=0)
+        active = np.where(last >= 0, switched == 1, self._active)
+
+        self._active = active[-1]
+        return np.where(active, a, 0.0)
+
+    def _integrate(self, t, a):
+        if self._last_t is not None:
+            # Carry the previous sample so the first trapezoid spans the chunk boundary
+            t_ext = np.concatenate([[self._last_t], t])
+            a_ext = np.concatenate([self._last_a[None], a])
+            vel = integrate_trapz_adaptive(a_ext, t_ext, initial=self.vel)
+            pos = integrate_trapz_adaptive(vel, t_ext, initial=self.pos)
+            vel, pos = vel[1:], pos[1:]
+        else:
+            vel = integrate_trapz_adaptive(a, t, initial=self.vel)
+            pos = integrate_trapz_adaptive(vel, t, initial=self.pos)
+
+        self._last_t = t[-1]
+        self._last_a = a[-1]
+        self.vel = vel[-1]
+        self.pos = pos[-1]
+        return vel, pos
+
+    # ---- streaming ----
+    def update(self, t, acc, yaw, pitch, roll):
+        """
+        Feed one chunk (same arrays as ``dead_reckon``).
+
+        Returns a dict with ``time``, ``acc``, ``vel`` and ``pos`` for the
+        samples that are final after this chunk (all of them without a
+        smoother, those older than ``smoothing_lag`` with one).
+        """
+        t = np.asarray(t, dtype=np.float64)
+        a = body_to_enu(acc, yaw, pitch, roll).astype(np.float64)
+
+        a = self._filter(t, a)
+        t, a = self._smooth(t, a)
+        if len(t) == 0:
+            empty = np.empty((0, 3))
+            return {"time": t, "acc": empty, "vel": empty, "pos": empty}
+
+        a = self._apply_hysteresis(a - self.bias)
+        vel, pos = self._integrate(t, a)
+        return {"time": t, "acc": a, "vel": vel, "pos": pos}
+
+    def flush(self):
+        """Emit the samples still held back by the smoother."""
+        if self.smoothing_lag is None or len(self._pending_t) == 0:
+            empty = np.empty((0, 3))
+            return {"time": np.empty(0), "acc": empty, "vel": empty, "pos": empty}
+
+        lag = self.smoothing_lag
+        self.smoothing_lag = -np.inf
+        try:
+            t, a = self._smooth(np.empty(0), np.empty((0, 3)))
+        finally:
+            self.smoothing_lag = lag
+
+        a = self._apply_hysteresis(a - self.bias)
+        vel, pos = self._integrate(t, a)
+        return {"time": t, "acc": a, "vel": vel, "pos": pos}
@@ -0,0 +1,198 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+
+FARNEBACK_PARAMS = dict(
+    pyr_scale=0.5, levels=3, winsize=15,
+    iterations=3, poly_n=5, poly_sigma=1.2, flags=0
+)
+
+
+def dense_optical_flow(prev_gray, gray):
+    """Full-frame Farneback flow of one pair (reference implementation)."""
+    flow = cv2.calcOpticalFlowFarneback(
+        prev_gray, gray, None,
+        0.5, 3, 15, 3, 5, 1.2, 0
+    )
+
+    dx = np.mean(flow[..., 0])
+    dy = np.mean(flow[..., 1])
+    return dx, dy, flow
+
+
+def _prepare(frame, roi, level):
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if roi is not None:
+        x, y, w, h = roi
+        frame = frame[y:y + h, x:x + w]
+    for _ in range(level):
+        frame = cv2.pyrDown(frame)
+    return frame
+
+
+def _flow_batch(frames_out, fields_out, start, stop, roi, level, percentiles, params):
+    """
+    Worker: flow of pairs ``(i - 1, i)`` for i in [start, stop).
+
+    Frames are read from (and fields written to) shared memory, so only
+    the summary statistics travel back through pickling.
+    """
+    # Pool workers share the parent's resource tracker, which unlinks the blocks
+    shm = shared_memory.SharedMemory(name=frames_out[1])
+    frames = np.ndarray(tuple(frames_out[0]), dtype=np.uint8, buffer=shm.buf)
+
+    fields_shm = None
+    fields = None
+    if fields_out is not None:
+        fields_shm = shared_memory.SharedMemory(name=fields_out[1])
+        fields = np.ndarray(tuple(fields_out[0]), dtype=np.float32, buffer=fields_shm.buf)
+
+    # Flow is reported in input pixels whatever level it was computed on
+    scale = float(2 ** level)
+    q = [50] + list(percentiles)
+    stats = np.empty((stop - start, 2 + 2 * len(q)))
+
+    prev = _prepare(frames[start - 1], roi, level)
+    for row, i in enumerate(range(start, stop)):
+        gray = _prepare(frames[i], roi, level)
+        flow = cv2.calcOpticalFlowFarneback(prev, gray, None, **params)
+        flow *= scale
+
+        vectors = flow.reshape(-1, 2)
+        stats[row, :2] = vectors.mean(axis=0)
+        # Rows: median, then each percentile; columns: dx, dy
+        stats[row, 2:] = np.percentile(vectors, q, axis=0).ravel()
+
+        if fields is not None:
+            fields[i - 1] = flow
+        prev = gray
+
+    del frames, fields
+    shm.close()
+    if fields_shm is not None:
+        fields_shm.close()
+    return stats
+
+
+class DenseFlowEngine:
+    """
+    Farneback flow over many frame pairs with a process pool.
+
+    Frames are gathered into chunks of ``chunk_frames``, copied once into a
+    shared-memory block and split into contiguous runs of pairs, one per
+    task; consecutive chunks overlap by one frame so no pair is lost. The
+    flow can be computed on a ``roi`` ``(x, y, w, h)`` and on pyramid
+    ``level`` (each level halves the resolution); vectors are scaled back
+    to input pixels. Per pair only summary statistics are returned unless
+    ``fields=True``.
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        level=0,
+        roi=None,
+        percentiles=(5, 95),
+        chunk_frames=512,
+        farneback_params=None
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.level = level
+        self.roi = roi
+        self.percentiles = tuple(percentiles)
+        self.chunk_frames = max(chunk_frames, 2)
+        self.params = dict(FARNEBACK_PARAMS, **(farneback_params or {}))
+
+    def field_shape(self, frame_shape):
+        h, w = frame_shape[:2]
+        if self.roi is not None:
+            w, h = min(self.roi[2], w - self.roi[0]), min(self.roi[3], h - self.roi[1])
+        for _ in range(self.level):
+            h, w = (h + 1) // 2, (w + 1) // 2
+        return (h, w, 2)
+
+    def _chunks(self, frames):
+        chunk = []
+        for frame in frames:
+            chunk.append(frame)
+            if len(chunk) == self.chunk_frames:
+                yield np.stack(chunk)
+                # Last frame starts the next chunk
+                chunk = [chunk[-1]]
+
+        if len(chunk) > 1:
+            yield np.stack(chunk)
+
+    def _run_chunk(self, pool, chunk, fields):
+        n = len(chunk)
+        shm = shared_memory.SharedMemory(create=True, size=chunk.nbytes)
+        fields_shm = None
+        try:
+            np.ndarray(chunk.shape, dtype=np.uint8, buffer=shm.buf)[:] = chunk
+
+            fields_out = None
+            if fields:
+                shape = (n - 1,) + self.field_shape(chunk.shape[1:])
+                fields_shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 4)
+                fields_out = (shape, fields_shm.name)
+
+            tasks = max(1, min(self.workers, n - 1))
+            bounds = [1 + round(i * (n - 1) / tasks) for i in range(tasks + 1)]
+            jobs = [
+                ((chunk.shape, shm.name), fields_out, a, b,
+                 self.roi, self.level, self.percentiles, self.params)
+                for a, b in zip(bounds[:-1], bounds[1:]) if b > a
+            ]
+
+            if pool is None:
+                parts = [_flow_batch(*job) for job in jobs]
+            else:
+                futures = [pool.submit(_flow_batch, *job) for job in jobs]
+                parts = [f.result() for f in futures]
+
+            flow = None
+            if fields_out is not None:
+                flow = np.ndarray(fields_out[0], dtype=np.float32, buffer=fields_shm.buf).copy()
+            return np.concatenate(parts), flow
+        finally:
+            shm.close()
+            shm.unlink()
+            if fields_shm is not None:
+                fields_shm.close()
+                fields_shm.unlink()
+
+    def compute(self, frames, fields=False):
+        """
+        Flow statistics for every consecutive pair of ``frames``.
+
+        ``frames`` is an array or any iterable of gray (or BGR) uint8 frames,
+        e.g. ``VideoFrameSource.prefetch()``. Returns a dict of ``(n - 1, 2)``
+        arrays ``mean``, ``median`` and ``p<q>`` for each percentile, plus
+        ``flow`` (``(n - 1, h, w, 2)`` float32) when ``fields=True``.
+        """
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        stats, flows = [], []
+        try:
+            for chunk in self._chunks(frames):
+                chunk_stats, chunk_flow = self._run_chunk(pool, chunk, fields)
+                stats.append(chunk_stats)
+                if fields:
+                    flows.append(chunk_flow)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        q = [50] + list(self.percentiles)
+        stats = np.concatenate(stats) if stats else np.empty((0, 2 + 2 * len(q)))
+
+        result = {"mean": stats[:, 0:2], "median": stats[:, 2:4]}
+        for k, p in enumerate(self.percentiles, start=1):
+            result[f"p{p:g}"] = stats[:, 2 + 2 * k:4 + 2 * k]
+        if fields:
+            result["flow"] = np.concatenate(flows) if flows else np.empty((0, 0, 0, 2), dtype=np.float32)
+        return result
@@ -0,0 +1,117 @@
+import cv2
+import numpy as np
+
+
+class AdaptiveFrameSelector:
+    """
+    Pick keyframes by how far the image has moved, not by a fixed stride.
+
+    Every incoming frame is shrunk to ``proxy_height`` rows and compared to
+    the last keyframe with ``cv2.phaseCorrelate`` (a few microseconds on a
+    tiny image). A frame becomes a keyframe once the estimated displacement
+    reaches ``min_displacement`` pixels (at the input resolution), so
+    near-identical high-speed frames are skipped. If a frame has already
+    moved more than ``max_displacement`` the previous frame is taken as well,
+    which densifies the selection on fast passes. ``max_gap`` bounds the
+    number of skipped frames.
+
+    Selected raw indices and their real timestamps (``raw_idx / fps``) are
+    collected in ``indices`` and ``times`` so downstream code can divide
+    displacements by the actual time between keyframes.
+    """
+
+    def __init__(
+        self,
+        fps,
+        min_displacement=1.0,
+        max_displacement=8.0,
+        max_gap=64,
+        proxy_height=64,
+        min_response=0.05
+    ):
+        self.fps = fps
+        self.min_displacement = min_displacement
+        self.max_displacement = max_displacement
+        self.max_gap = max_gap
+        self.proxy_height = proxy_height
+        self.min_response = min_response
+
+        self.indices = []
+        self.times = []
+        self.seen = 0
+
+        self._window = None
+
+    def _proxy(self, frame):
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        h, w = frame.shape
+        width = max(int(w * self.proxy_height / h), 1)
+        tiny = cv2.resize(frame, (width, self.proxy_height), interpolation=cv2.INTER_AREA)
+        tiny = np.float32(tiny)
+
+        if self._window is None or self._window.shape != tiny.shape:
+            self._window = cv2.createHanningWindow(tiny.shape[::-1], cv2.CV_32F)
+        return tiny, h / self.proxy_height
+
+    def _displacement(self, key_tiny, tiny, scale):
+        (sx, sy), response = cv2.phaseCorrelate(key_tiny, tiny, self._window)
+        if response < self.min_response:
+            # Unreliable match (blur, occlusion): treat as large motion
+            return np.inf
+        return np.hypot(sx, sy) * scale
+
+    def _keep(self, raw_idx):
+        self.indices.append(int(raw_idx))
+        self.times.append(raw_idx / self.fps)
+
+    def select(self, frames, indices):
+        """
+        Yield the keyframes of ``frames`` (raw frame numbers ``indices``).
+
+        ``frames`` can be any iterable, e.g. ``VideoFrameSource.prefetch()``
+        with ``indices = source.indices``.
+        """
+        key = None
+        prev = None
+        gap = 0
+
+        for raw_idx, frame in zip(indices, frames):
+            self.seen += 1
+            tiny, scale = self._proxy(frame)
+
+            if key is None:
+                key = tiny
+                self._keep(raw_idx)
+                yield frame
+                prev = (raw_idx, frame, tiny, True)
+                continue
+
+            gap += 1
+            moved = self._displacement(key, tiny, scale)
+
+            # Too far already: the previous frame still had a trackable step
+            if moved > self.max_displacement and not prev[3]:
+                key = prev[2]
+                self._keep(prev[0])
+                yield prev[1]
+                gap = 1
+                moved = self._displacement(key, tiny, scale)
+
+            if moved >= self.min_displacement or gap >= self.max_gap:
+                key = tiny
+                self._keep(raw_idx)
+                yield frame
+                gap = 0
+                prev = (raw_idx, frame, tiny, True)
+            else:
+                prev = (raw_idx, frame, tiny, False)
+
+    def iter_keyframes(self, source, queue_size=16):
+        """Keyframes of a ``VideoFrameSource``, decoded ahead on a background thread."""
+        return self.select(source.prefetch(queue_size), source.indices)
+
+    @property
+    def ratio(self):
+        """Fraction of the frames seen that were kept."""
+        return len(self.indices) / self.seen if self.seen else 0.0
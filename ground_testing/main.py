@@ -4,105 +4,127 @@ import numpy as np
 import matplotlib.pyplot as plt
 import math
 import os
+import sys
+
+sys.path.append(os.path.abspath("../sim"))
+from utilities.VideoFrameSource import VideoFrameSource
+from utilities.FrameCache import FrameCache
+from utilities.Profiler import profiler
+from optical_flow import SparseFlowTracker, flow_stream
+from dense_flow import DenseFlowEngine
+from frame_selection import AdaptiveFrameSelector
 
 #%% Parameters
 video_path = "G:/projekt gropwy/22.10.2025/video/raw/720p/5.1.mov"
 target_height = 360
-frame_interval = 2
+frame_interval = 1  # finest stride; the adaptive selector skips frames on top of it
 cut_pixels = 200
-start_frame = 210
+start_frame = 420
+adaptive_frames = True  # pick frames by image displacement instead of a fixed stride
+min_displacement_px = 1.0  # skip frames until the image has moved this far
+max_displacement_px = 8.0  # never let consecutive keyframes move further than this
+use_frame_cache = False  # True: decode once into the on-disk cache instead of streaming
+decode_workers = 1  # >1 decodes keyframe-aligned segments in parallel processes (cache only)
+prefetch_frames = 16  # frames decoded ahead while flow runs
+print_every = 500  # progress print interval (frames)
+dense_workers = 0  # >0 also runs Farneback dense flow on that many processes
+dense_level = 1  # pyramid level for dense flow (each level halves resolution)
+dense_roi = None  # (x, y, w, h) region for dense flow, None = whole frame
+profile = False  # record stage spans/counters (decode, resize, gray, detect, LK) with peak memory
+profile_dir = "profile"  # profile.json + trace.json (chrome://tracing / Perfetto) go here
 fps_capture = 1209  # original capture frame rate
 meters_per_pixel_y = 0.0006  # Y-scale in meters
 meters_per_pixel_y = meters_per_pixel_y / (1080 / target_height)  # adjust for resized height
 
-#%% Read and preprocess video frames
-cap = cv2.VideoCapture(video_path)
-frames = []
-frame_counter = 0
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    if frame_counter % frame_interval == 0:
-        # Resize frame
-        h, w = frame.shape[:2]
-        scale = target_height / h
-        new_width = int(w * scale)
-        resized_frame = cv2.resize(frame, (new_width, target_height), interpolation=cv2.INTER_AREA)
-
-        # Crop left side
-        cropped_frame = resized_frame[:, cut_pixels:]
-        frames.append(cropped_frame)
-
-    frame_counter += 1
-
-cap.release()
-
-# Trim frames starting at start_frame
-frames = frames[start_frame:]
-
-print(f"Frames captured after preprocessing: {len(frames)}")
-if frames:
-    print(f"First frame shape: {frames[0].shape}")
-
-#%% Sparse optical flow function
-def sparse_optical_flow(prev_gray, gray):
-    prev_points = cv2.goodFeaturesToTrack(
-        prev_gray, maxCorners=500, qualityLevel=0.3,
-        minDistance=7, blockSize=7
-    )
-    if prev_points is None:
-        return 0.0, 0.0, None
-
-    lk_params = dict(
-        winSize=(15, 15),
-        maxLevel=2,
-        criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+if profile:
+    profiler.reset()
+    profiler.enable(memory=True)
+
+#%% Frame stream
+# decode -> resize -> crop -> gray happens frame by frame inside the source;
+# slicing at start_frame seeks past the skipped frames instead of decoding them
+source = VideoFrameSource(
+    video_path,
+    step=frame_interval,
+    color=cv2.COLOR_BGR2GRAY,
+    target_height=target_height,
+    cut_pixels=cut_pixels,
+    progress=True
+)[start_frame:]
+
+print(f"Frames after preprocessing: {len(source)}")
+print(f"Frame shape: {source.frame_shape}")
+
+if use_frame_cache:
+    # Re-runs with the same target_height/cut_pixels/frame_interval map the
+    # frames straight from the on-disk cache
+    frames = FrameCache().load(source, workers=decode_workers)
+else:
+    # Only the previous frame, the current one and the prefetch queue live in memory
+    frames = source.prefetch(prefetch_frames)
+
+# Real capture time of every frame that reaches the flow stage
+if adaptive_frames:
+    selector = AdaptiveFrameSelector(
+        fps_capture,
+        min_displacement=min_displacement_px,
+        max_displacement=max_displacement_px
     )
-
-    next_points, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, prev_points, None, **lk_params)
-    good_new = next_points[status == 1]
-    good_old = prev_points[status == 1]
-
-    dx, dy = np.mean(good_new - good_old, axis=0)
-    return dx, dy, next_points
+    frames = selector.select(frames, source.indices)
+    times = selector.times  # filled while frames are consumed
+else:
+    times = list(np.asarray(source.indices) / fps_capture)
 
 #%% Compute motion
-gray_frames = [cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in frames]
+# Corners are tracked across frames and only re-detected when tracks run out
+tracker = SparseFlowTracker()
 motion = []
 
 print("Computing sparse optical flow...")
-for i in range(1, len(gray_frames)):
-    dx, dy, _ = sparse_optical_flow(gray_frames[i - 1], gray_frames[i])
-    motion.append([dx, dy])
-
-motion = np.array(motion)
+with profiler.span("flow_loop"):
+    for i, (dx, dy) in enumerate(flow_stream(frames, tracker), start=1):
+        motion.append((dx, dy))
+        if i % print_every == 0:
+            print(f"Frame {i}: dx={dx:.3f} dy={dy:.3f}")
+
+motion = np.array(motion).reshape(-1, 2)
+times = np.asarray(times)
+dt = np.diff(times)
 print(f"Sparse motion shape: {motion.shape}")
+if adaptive_frames:
+    print(f"Adaptive selection kept {len(times)} of {selector.seen} frames ({selector.ratio:.1%})")
+print(f"Tracker: {tracker.stats()}")
 print("Example (first 5 frames):")
 print(motion[:5])
 
-#%% Plot motion per frame
-frames_idx = np.arange(1, len(motion) + 1)
-motion_dx = motion[:, 0]
-motion_dy = motion[:, 1]
+if profile:
+    profiler.disable()
+    profiler.print_summary()
+    profiler.save_json(os.path.join(profile_dir, "profile.json"))
+    profiler.save_chrome_trace(os.path.join(profile_dir, "trace.json"))
+    print(f"Profile written to {profile_dir}/")
 
-# Δx per frame
+#%% Plot motion over time
+# Frames are not evenly spaced, so displacement is divided by the real time step
+pair_time = times[1:]
+motion_dx = motion[:, 0] / dt
+motion_dy = motion[:, 1] / dt
+
+# Δx rate
 plt.figure(figsize=(12, 4))
-plt.plot(frames_idx, motion_dx, color="blue")
-plt.title("Sparse Optical Flow Δx (pixels/frame)")
-plt.xlabel("Frame")
-plt.ylabel("Δx")
+plt.plot(pair_time, motion_dx, color="blue")
+plt.title("Sparse Optical Flow Δx (pixels/s)")
+plt.xlabel("Time (s)")
+plt.ylabel("Δx / Δt")
 plt.grid(True)
 plt.show()
 
-# Δy per frame
+# Δy rate
 plt.figure(figsize=(12, 4))
-plt.plot(frames_idx, motion_dy, color="green")
-plt.title("Sparse Optical Flow Δy (pixels/frame)")
-plt.xlabel("Frame")
-plt.ylabel("Δy")
+plt.plot(pair_time, motion_dy, color="green")
+plt.title("Sparse Optical Flow Δy (pixels/s)")
+plt.xlabel("Time (s)")
+plt.ylabel("Δy / Δt")
 plt.grid(True)
 plt.show()
 
@@ -117,3 +139,26 @@ plt.axis("equal")
 plt.grid(True)
 plt.show()
 
+#%% Dense optical flow (optional)
+if dense_workers > 0:
+    engine = DenseFlowEngine(workers=dense_workers, level=dense_level, roi=dense_roi)
+    # Dense flow runs on the frames the sparse pass kept
+    dense_source = source.select(selector.indices) if adaptive_frames else source
+    dense = engine.compute(dense_source.prefetch(prefetch_frames))
+
+    dense_motion = dense["median"]
+    print(f"Dense motion shape: {dense_motion.shape}")
+
+    plt.figure(figsize=(12, 4))
+    n = len(dense_motion)
+    plt.plot(pair_time[:n], dense_motion[:, 1] / dt[:n], color="green", label="median Δy")
+    plt.fill_between(
+        pair_time[:n], dense["p5"][:, 1] / dt[:n], dense["p95"][:, 1] / dt[:n],
+        color="green", alpha=0.2, label="5-95%"
+    )
+    plt.title("Dense Optical Flow Δy (pixels/s)")
+    plt.xlabel("Time (s)")
+    plt.ylabel("Δy / Δt")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
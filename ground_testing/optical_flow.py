@@ -0,0 +1,224 @@
+import contextlib
+import time
+
+import cv2
+import numpy as np
+
+try:
+    from utilities.Profiler import profiler
+except ImportError:
+    # ../sim not on sys.path (standalone use): instrumentation is a no-op
+    class _NullProfiler:
+        def span(self, name, **args):
+            return contextlib.nullcontext()
+
+        def count(self, name, value=1):
+            pass
+
+    profiler = _NullProfiler()
+
+
+def sparse_optical_flow(prev_gray, gray):
+    """Per-pair flow: fresh corners on ``prev_gray`` every call (reference implementation)."""
+    with profiler.span("feature_detect"):
+        prev_points = cv2.goodFeaturesToTrack(
+            prev_gray, maxCorners=500, qualityLevel=0.3,
+            minDistance=7, blockSize=7
+        )
+    if prev_points is None:
+        return 0.0, 0.0, None
+
+    lk_params = dict(
+        winSize=(15, 15),
+        maxLevel=2,
+        criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+    )
+
+    with profiler.span("lk_track"):
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, prev_points, None, **lk_params)
+    good_new = next_points[status == 1]
+    good_old = prev_points[status == 1]
+
+    dx, dy = np.mean(good_new - good_old, axis=0)
+    return dx, dy, next_points
+
+
+def flow_stream(gray_frames, tracker=None):
+    """
+    Yield ``(dx, dy)`` for every consecutive pair of an iterable of gray frames.
+
+    Only the tracker's previous frame is kept, so any generator of frames
+    (e.g. ``VideoFrameSource.prefetch()``) is processed in constant memory.
+    """
+    tracker = tracker or SparseFlowTracker()
+    for gray in gray_frames:
+        flow = tracker.update(gray)
+        if flow is not None:
+            yield flow
+
+
+class SparseFlowTracker:
+    """
+    Lucas-Kanade tracker that carries corners from frame to frame.
+
+    Corners are detected once and then tracked; new ones are added only
+    when the number of surviving tracks or their spatial coverage (share of
+    ``grid`` cells holding a track) drops below a threshold. Every track is
+    checked forward-backward and dropped if it does not come back to where
+    it started. Each direction is a single pyramidal LK call over all
+    tracks.
+
+    ``update(gray)`` returns the mean ``(dx, dy)`` of the surviving tracks,
+    the same quantity as ``sparse_optical_flow``.
+    """
+
+    def __init__(
+        self,
+        max_corners=500,
+        quality_level=0.3,
+        min_distance=7,
+        block_size=7,
+        win_size=(15, 15),
+        max_level=2,
+        min_tracks=100,
+        min_coverage=0.5,
+        grid=(4, 4),
+        fb_threshold=1.0
+    ):
+        self.max_corners = max_corners
+        self.quality_level = quality_level
+        self.min_distance = min_distance
+        self.block_size = block_size
+        self.win_size = win_size
+        self.max_level = max_level
+        self.min_tracks = min_tracks
+        self.min_coverage = min_coverage
+        self.grid = grid
+        self.fb_threshold = fb_threshold
+        self.criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+
+        self.reset()
+
+    def reset(self):
+        self.points = None
+        self._prev_gray = None
+
+        # ---- stats ----
+        self.frames = 0
+        self.tracked = 0
+        self.detections = 0
+        self.elapsed = 0.0
+
+    # ---- helpers ----
+    def _lk(self, prev_gray, next_gray, points):
+        # The Python bindings reject prebuilt pyramids, so LK builds them
+        # itself; that is cheaper than driving the levels from Python
+        found, status, _ = cv2.calcOpticalFlowPyrLK(
+            prev_gray, next_gray, points, None,
+            winSize=self.win_size, maxLevel=self.max_level, criteria=self.criteria
+        )
+        return found, status
+
+    def coverage(self, shape):
+        """Share of grid cells that hold at least one track."""
+        if self.points is None or len(self.points) == 0:
+            return 0.0
+
+        rows, cols = self.grid
+        h, w = shape[:2]
+        pts = self.points.reshape(-1, 2)
+        cx = np.clip((pts[:, 0] * cols / w).astype(int), 0, cols - 1)
+        cy = np.clip((pts[:, 1] * rows / h).astype(int), 0, rows - 1)
+        return len(np.unique(cy * cols + cx)) / (rows * cols)
+
+    def _needs_detection(self, shape):
+        if self.points is None or len(self.points) < self.min_tracks:
+            return True
+        return self.coverage(shape) < self.min_coverage
+
+    def _detect(self, gray):
+        # Keep existing tracks and only fill the space around them
+        mask = None
+        existing = 0
+        if self.points is not None and len(self.points):
+            existing = len(self.points)
+            mask = np.full(gray.shape[:2], 255, dtype=np.uint8)
+            for x, y in self.points.reshape(-1, 2):
+                cv2.circle(mask, (int(x), int(y)), self.min_distance, 0, -1)
+
+        wanted = self.max_corners - existing
+        if wanted <= 0:
+            return
+
+        with profiler.span("feature_detect"):
+            new = cv2.goodFeaturesToTrack(
+                gray, maxCorners=wanted, qualityLevel=self.quality_level,
+                minDistance=self.min_distance, blockSize=self.block_size, mask=mask
+            )
+        self.detections += 1
+        if new is None:
+            return
+
+        new = new.astype(np.float32)
+        self.points = new if not existing else np.concatenate([self.points, new])
+
+    # ---- tracking ----
+    def update(self, gray):
+        """
+        Feed the next gray frame.
+
+        Returns ``(dx, dy)`` relative to the previous frame, or None for the
+        first frame.
+        """
+        start = time.perf_counter()
+        flow = None
+
+        if self._prev_gray is not None:
+            flow = (0.0, 0.0)
+            if self.points is not None and len(self.points):
+                p0 = self.points
+                with profiler.span("lk_track", points=len(p0)):
+                    p1, st_fwd = self._lk(self._prev_gray, gray, p0)
+                    p0_back, st_bwd = self._lk(gray, self._prev_gray, p1)
+
+                fb_error = np.linalg.norm((p0 - p0_back).reshape(-1, 2), axis=1)
+                good = (st_fwd.ravel() == 1) & (st_bwd.ravel() == 1) & (fb_error < self.fb_threshold)
+
+                if good.any():
+                    dx, dy = np.mean((p1 - p0).reshape(-1, 2)[good], axis=0)
+                    flow = (float(dx), float(dy))
+
+                self.points = p1[good].reshape(-1, 1, 2)
+                self.tracked += int(good.sum())
+                profiler.count("tracked_points", int(good.sum()))
+
+        if self._needs_detection(gray.shape):
+            self._detect(gray)
+
+        self._prev_gray = gray
+        self.frames += 1
+        profiler.count("flow_frames")
+        self.elapsed += time.perf_counter() - start
+        return flow
+
+    def track(self, gray_frames):
+        """Flow for every consecutive pair of ``gray_frames`` as an ``(n - 1, 2)`` array."""
+        return np.array(list(flow_stream(gray_frames, self))).reshape(-1, 2)
+
+    # ---- stats ----
+    @property
+    def tracks_per_second(self):
+        return self.tracked / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def frames_per_second(self):
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "tracked_points": self.tracked,
+            "detections": self.detections,
+            "tracks_per_second": self.tracks_per_second,
+            "frames_per_second": self.frames_per_second,
+        }
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Columns written by the phone sensor-logger app (";" separated, "," decimals)
+SENSOR_SCHEMA = {
+    "time": np.float64,
+    "ax": np.float64, "ay": np.float64, "az": np.float64,
+    "wx": np.float64, "wy": np.float64, "wz": np.float64,
+    "Bx": np.float64, "By": np.float64, "Bz": np.float64,
+    "Azimuth": np.float64, "Pitch": np.float64, "Roll": np.float64,
+    "Latitude": np.float64, "Longitude": np.float64,
+    "Speed (m/s)": np.float64, "Altitude (m)": np.float64,
+}
+
+
+class SensorCSVLoader:
+    """
+    Reader for the phone sensor logs (``sep=";"``, ``decimal=","``).
+
+    Columns are parsed straight into the dtypes of ``schema`` by pandas' C
+    engine (no per-column ``to_numeric`` pass). Rows can be skipped and
+    decimated while reading, so dropped rows are never materialized, and
+    the file can be streamed in chunks with a time window. Parsed results
+    are cached as ``.npy`` structured arrays keyed by the file and the read
+    options; a cached file is reused until the CSV changes.
+    """
+
+    def __init__(self, schema=None, sep=";", decimal=",", cache_dir=None):
+        self.schema = dict(schema or SENSOR_SCHEMA)
+        self.sep = sep
+        self.decimal = decimal
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "airtrace", "sensor_csv")
+        self.cache_dir = cache_dir
+
+    # ---- options ----
+    @staticmethod
+    def _skiprows(skip, every):
+        if not skip and every == 1:
+            return None
+
+        # Line 0 is the header; data row k is line k + 1
+        def skiprows(line):
+            if line == 0:
+                return False
+            row = line - 1 - skip
+            return row < 0 or row % every != 0
+
+        return skiprows
+
+    def _columns(self, path, columns):
+        header = pd.read_csv(path, sep=self.sep, nrows=0).columns
+        stripped = {c.strip(): c for c in header}
+        wanted = list(self.schema) if columns is None else list(columns)
+        return [stripped[c] for c in wanted if c in stripped]
+
+    # ---- parsing ----
+    def _kwargs(self, usecols, skip, every, chunksize):
+        return dict(
+            sep=self.sep, decimal=self.decimal, usecols=usecols,
+            skiprows=self._skiprows(skip, every), chunksize=chunksize, engine="c"
+        )
+
+    def _dtype(self, usecols):
+        return {c: self.schema.get(c.strip(), np.float64) for c in usecols}
+
+    def _coerce(self, df):
+        for c in df.columns:
+            values = df[c].str.replace(self.decimal, ".", regex=False)
+            df[c] = pd.to_numeric(values, errors="coerce")
+        return df
+
+    def _read(self, path, usecols, skip, every):
+        kwargs = self._kwargs(usecols, skip, every, None)
+        try:
+            return pd.read_csv(path, dtype=self._dtype(usecols), **kwargs)
+        except ValueError:
+            # A malformed cell somewhere: fall back to coercing (bad values -> NaN)
+            return self._coerce(pd.read_csv(path, dtype=str, **kwargs))
+
+    def _read_chunks(self, path, usecols, skip, every, chunksize):
+        kwargs = self._kwargs(usecols, skip, every, chunksize)
+        done = 0
+        try:
+            for chunk in pd.read_csv(path, dtype=self._dtype(usecols), **kwargs):
+                done += 1
+                yield chunk
+            return
+        except ValueError:
+            pass
+
+        # Malformed cell: re-read the remaining chunks with coercion
+        for i, chunk in enumerate(pd.read_csv(path, dtype=str, **kwargs)):
+            if i >= done:
+                yield self._coerce(chunk)
+
+    def iter_chunks(self, path, columns=None, skip=0, every=1, t_start=None, t_stop=None, chunksize=200_000):
+        """
+        Yield DataFrames of at most ``chunksize`` rows within [t_start, t_stop].
+
+        Reading stops at the first chunk that starts after ``t_stop``
+        (the log's ``time`` column is increasing).
+        """
+        usecols = self._columns(path, columns)
+        time_col = next((c for c in usecols if c.strip() == "time"), None)
+        if (t_start is not None or t_stop is not None) and time_col is None:
+            usecols.append(self._columns(path, ["time"])[0])
+            time_col = usecols[-1]
+
+        for chunk in self._read_chunks(path, usecols, skip, every, chunksize):
+            chunk.columns = chunk.columns.str.strip()
+            if time_col is not None and (t_start is not None or t_stop is not None):
+                time = chunk["time"].to_numpy()
+                if t_stop is not None and len(time) and time[0] > t_stop:
+                    break
+                keep = np.ones(len(chunk), dtype=bool)
+                if t_start is not None:
+                    keep &= time >= t_start
+                if t_stop is not None:
+                    keep &= time <= t_stop
+                chunk = chunk[keep]
+            if len(chunk):
+                yield chunk
+
+    # ---- cache ----
+    def _cache_path(self, path, options):
+        stat = os.stat(path)
+        key = json.dumps({
+            "path": os.path.abspath(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "schema": {c: np.dtype(t).str for c, t in self.schema.items()},
+            "options": options,
+        }, sort_keys=True)
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{name}-{digest}.npy")
+
+    def _to_table(self, df):
+        table = np.empty(len(df), dtype=[(c, df[c].dtype) for c in df.columns])
+        for c in df.columns:
+            table[c] = df[c].to_numpy()
+        return table
+
+    def read(self, path, columns=None, skip=0, every=1, t_start=None, t_stop=None, chunksize=None, cache=True):
+        """
+        Parse ``path`` into a DataFrame.
+
+        ``skip``/``every`` replace ``df[skip:][::every]``; ``t_start``/
+        ``t_stop`` keep a time window (read in chunks of ``chunksize`` rows,
+        200k by default when a window is given).
+        """
+        options = dict(columns=columns, skip=skip, every=every, t_start=t_start, t_stop=t_stop)
+        cache_path = self._cache_path(path, options) if cache else None
+        if cache_path is not None and os.path.exists(cache_path):
+            return pd.DataFrame(np.load(cache_path))
+
+        if chunksize is None and t_start is None and t_stop is None:
+            usecols = self._columns(path, columns)
+            df = self._read(path, usecols, skip, every)
+            df.columns = df.columns.str.strip()
+        else:
+            chunks = list(self.iter_chunks(
+                path, columns, skip, every, t_start, t_stop, chunksize or 200_000
+            ))
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(
+                columns=self._columns(path, columns)
+            )
+
+        if cache_path is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = cache_path + ".tmp.npy"
+            np.save(tmp, self._to_table(df))
+            os.replace(tmp, cache_path)
+
+        return df
+
+    def invalidate(self, path=None):
+        """Remove cached results (of one CSV, or all)."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        prefix = None if path is None else os.path.splitext(os.path.basename(path))[0] + "-"
+        for name in os.listdir(self.cache_dir):
+            if prefix is None or name.startswith(prefix):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
@@ -0,0 +1,273 @@
+"""
+Batch synchronization of many flights.
+
+Every sub-directory of ``root`` holding a video (``.mp4``/``.mov``) and a
+``.ulg`` log is a flight. Flights are processed in parallel worker
+processes (one fresh process per flight, optionally with an address-space
+limit); each one exports its telemetry, estimates the video/PX4 clock
+mapping and writes the per-frame telemetry to ``synced.npz``. Flights whose
+inputs have not changed since the last successful run are skipped.
+A ``manifest.json`` in ``root`` records timings, frame counts, alignment
+parameters and failures.
+
+A ``sync.json`` in a flight directory with ``telemetry_start_idx``,
+``telemetry_end_idx``, ``video_start_time`` and ``video_end_time`` uses
+those hand-tuned constants instead of the automatic estimate; a file
+missing any of them fails that flight with the missing keys named.
+
+    python batch_process.py data/ --workers 8 --memory-limit 6
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+VIDEO_SUFFIXES = (".mp4", ".mov")
+OUTPUT_NAME = "synced.npz"
+MANIFEST_NAME = "manifest.json"
+MANUAL_KEYS = ("telemetry_start_idx", "telemetry_end_idx", "video_start_time", "video_end_time")
+
+
+# ---- discovery ----
+def discover_flights(root):
+    """``{name: {"dir", "video", "ulog"}}`` for every flight directory below ``root``."""
+    flights = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        videos = sorted(f for f in filenames if f.lower().endswith(VIDEO_SUFFIXES) and f != "output.mp4")
+        ulogs = sorted(f for f in filenames if f.lower().endswith(".ulg"))
+        if not videos or not ulogs:
+            continue
+
+        name = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        flights[name] = {
+            "dir": dirpath,
+            "video": os.path.join(dirpath, videos[0]),
+            "ulog": os.path.join(dirpath, ulogs[0]),
+        }
+    return flights
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def flight_signature(flight, options):
+    signature = {
+        "video": file_signature(flight["video"]),
+        "ulog": file_signature(flight["ulog"]),
+        "options": options,
+    }
+    manual = os.path.join(flight["dir"], "sync.json")
+    if os.path.exists(manual):
+        signature["sync.json"] = file_signature(manual)
+    return signature
+
+
+def is_current(entry, flight, signature):
+    return (
+        entry is not None
+        and entry.get("status") == "ok"
+        and entry.get("signature") == signature
+        and os.path.exists(os.path.join(flight["dir"], OUTPUT_NAME))
+    )
+
+
+# ---- manifest ----
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {"flights": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(path, manifest):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+# ---- worker ----
+def _limit_memory(memory_limit_gb):
+    if not memory_limit_gb:
+        return False
+    try:
+        import resource
+    except ImportError:
+        # Windows: no RLIMIT_AS
+        return False
+
+    limit = int(memory_limit_gb * 1024 ** 3)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    return True
+
+
+def process_flight(name, flight, options):
+    """Worker: sync one flight. Returns its manifest entry (never raises)."""
+    start = time.perf_counter()
+    entry = {"name": name, "dir": flight["dir"], "video": flight["video"], "ulog": flight["ulog"]}
+    log_path = os.path.join(flight["dir"], "process.log")
+
+    try:
+        entry["memory_limited"] = _limit_memory(options["memory_limit_gb"])
+
+        # stderr too: tqdm progress bars would otherwise interleave on the parent's terminal
+        with open(log_path, "w") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            # Imported here so the parent process stays light
+            import numpy as np
+            from utilities.TelementryVideoSync import TelemetryVideoSync
+
+            manual = os.path.join(flight["dir"], "sync.json")
+            constants = {}
+            if os.path.exists(manual):
+                with open(manual) as f:
+                    constants = json.load(f)
+                missing = [key for key in MANUAL_KEYS if constants.get(key) is None]
+                if constants and missing:
+                    raise ValueError(f"{manual} is missing {', '.join(missing)}")
+
+            sync = TelemetryVideoSync(
+                constants.get("telemetry_start_idx"),
+                constants.get("telemetry_end_idx"),
+                constants.get("video_start_time"),
+                constants.get("video_end_time"),
+                flight["video"],
+                flight["ulog"],
+                os.path.join(flight["dir"], "csv"),
+                save_every_n=options["save_every_n"],
+                workers=options["decode_workers"],
+            )
+
+            t = time.perf_counter()
+            sync.read_telemetry()
+            entry["telemetry_seconds"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            if constants:
+                entry["sync_method"] = "manual"
+            else:
+                result = sync.estimate_sync(rate=options["rate"])
+                entry["sync_method"] = "estimated"
+                entry["sync_score"] = result["score"]
+                entry["sync_residual"] = result["residual"]
+                entry["time_offset"] = sync.time_offset
+                entry["time_scale"] = sync.time_scale
+            entry["sync_seconds"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            sync.analyze_telemetry()
+            entry["align_seconds"] = time.perf_counter() - t
+
+            np.savez(
+                os.path.join(flight["dir"], OUTPUT_NAME),
+                frame_index=sync.frame_index,
+                video_time=sync.video_time,
+                telemetry_time=sync.gps_time,
+                yaw=sync.yaw,
+                pitch=sync.pitch,
+                roll=sync.roll,
+                gps_alt=sync.gps_alt,
+            )
+
+        entry["status"] = "ok"
+        entry["frames"] = len(sync.frames)
+        entry["fps"] = sync.fps
+        entry["output"] = os.path.join(flight["dir"], OUTPUT_NAME)
+    except Exception as exc:
+        entry["status"] = "failed"
+        entry["error"] = f"{type(exc).__name__}: {exc}"
+        entry["traceback"] = traceback.format_exc()
+
+    entry["seconds"] = time.perf_counter() - start
+    entry["finished"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    return entry
+
+
+# ---- runner ----
+def run(root, workers=None, memory_limit_gb=None, force=False, rate=20.0, save_every_n=1, decode_workers=1):
+    flights = discover_flights(root)
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    options = {"rate": rate, "save_every_n": save_every_n}
+
+    todo = {}
+    for name, flight in flights.items():
+        signature = flight_signature(flight, options)
+        if not force and is_current(manifest["flights"].get(name), flight, signature):
+            print(f"[skip] {name} (up to date)")
+            continue
+        todo[name] = signature
+
+    print(f"{len(flights)} flights, {len(todo)} to process")
+    if not todo:
+        return manifest
+
+    job_options = dict(options, memory_limit_gb=memory_limit_gb, decode_workers=decode_workers)
+    workers = min(workers or os.cpu_count() or 1, len(todo))
+    started = time.perf_counter()
+
+    # One fresh process per flight: memory goes back to the OS after each one
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        futures = {
+            pool.submit(process_flight, name, flights[name], job_options): name
+            for name in todo
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                entry = future.result()
+            except BaseException as exc:
+                # Worker died (e.g. killed by the OS)
+                entry = {"name": name, "status": "failed", "error": f"{type(exc).__name__}: {exc}"}
+
+            entry["signature"] = todo[name]
+            manifest["flights"][name] = entry
+            save_manifest(manifest_path, manifest)
+
+            status = entry["status"]
+            detail = entry.get("error") or f"{entry.get('frames')} frames"
+            print(f"[{status}] {name} in {entry.get('seconds', 0):.1f}s - {detail}")
+
+    elapsed = time.perf_counter() - started
+    manifest["last_run"] = {
+        "processed": len(todo),
+        "failed": sum(manifest["flights"][n]["status"] != "ok" for n in todo),
+        "workers": workers,
+        "seconds": elapsed,
+        "flights_per_minute": 60 * len(todo) / elapsed if elapsed > 0 else None,
+    }
+    save_manifest(manifest_path, manifest)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synchronize video and telemetry for every flight under ROOT.")
+    parser.add_argument("root", help="directory containing one sub-directory per flight")
+    parser.add_argument("--workers", type=int, default=None, help="parallel flights (default: CPU count)")
+    parser.add_argument("--memory-limit", type=float, default=None, help="per-flight address-space limit in GiB")
+    parser.add_argument("--force", action="store_true", help="reprocess flights that are up to date")
+    parser.add_argument("--rate", type=float, default=20.0, help="sync correlation rate in Hz")
+    parser.add_argument("--save-every-n", type=int, default=1, help="keep every Nth video frame")
+    parser.add_argument("--decode-workers", type=int, default=1, help="decoder processes per flight")
+    args = parser.parse_args(argv)
+
+    manifest = run(
+        args.root,
+        workers=args.workers,
+        memory_limit_gb=args.memory_limit,
+        force=args.force,
+        rate=args.rate,
+        save_every_n=args.save_every_n,
+        decode_workers=args.decode_workers,
+    )
+    failed = [n for n, e in manifest["flights"].items() if e.get("status") != "ok"]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
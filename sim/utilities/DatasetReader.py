@@ -0,0 +1,157 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+class DatasetReader:
+    """
+    Random access to a dataset written by ``DatasetWriter``.
+
+    Shards, the offset index and the telemetry columns are memory-mapped,
+    so ``reader[i]`` is O(1): one index lookup and one slice of a mapped
+    shard (zero-copy for raw frames, one ``cv2.imdecode`` for encoded
+    ones). Maps are opened lazily per process, so a reader can be handed
+    to worker processes (e.g. a PyTorch ``DataLoader``) and each worker
+    maps the files itself.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"Not a dataset (or still being written): {path}")
+        with open(meta_path) as f:
+            self.meta = json.load(f)
+
+        self.frame_shape = tuple(self.meta["frame_shape"])
+        self.encoding = self.meta["encoding"]
+        self.columns = list(self.meta["columns"])
+
+        self._maps = None
+        self._pid = None
+
+    # ---- mapping ----
+    def _open(self):
+        if self._pid == os.getpid():
+            return self._maps
+
+        # (Re)map after a fork: file maps are not shared between processes
+        mode = "r" if len(self) else None  # empty files cannot be mapped
+        index = np.load(os.path.join(self.path, "index.npy"), mmap_mode=mode)
+        telemetry = {
+            name: np.load(os.path.join(self.path, "telemetry", f"{name}.npy"), mmap_mode=mode)
+            for name in self.columns
+        }
+        shards = [None] * len(self.meta["shards"])
+        self._maps = {"index": index, "telemetry": telemetry, "shards": shards}
+        self._pid = os.getpid()
+        return self._maps
+
+    def _shard(self, k):
+        shards = self._open()["shards"]
+        if shards[k] is None:
+            path = os.path.join(self.path, self.meta["shards"][k]["file"])
+            shards[k] = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else np.empty(0, np.uint8)
+        return shards[k]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_maps"] = None
+        state["_pid"] = None
+        return state
+
+    # ---- access ----
+    def __len__(self):
+        return self.meta["count"]
+
+    @property
+    def telemetry(self):
+        """``{column: array}`` over all samples (memory-mapped)."""
+        return self._open()["telemetry"]
+
+    @property
+    def flights(self):
+        return self.meta["flights"]
+
+    def frame(self, i):
+        shard, offset, length = self._open()["index"][i]
+        blob = self._shard(shard)[offset:offset + length]
+
+        if self.encoding == "raw":
+            return blob.reshape(self.frame_shape)
+
+        frame = cv2.imdecode(np.asarray(blob), cv2.IMREAD_UNCHANGED)
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return frame
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"Sample {i} out of range")
+
+        sample = {"frame": self.frame(i)}
+        for name, values in self.telemetry.items():
+            sample[name] = values[i]
+        return sample
+
+    def batch(self, indices):
+        """Frames stacked into one array plus every telemetry column, for ``indices``."""
+        indices = np.asarray(indices)
+        frames = np.empty((len(indices),) + self.frame_shape, dtype=np.uint8)
+        for n, i in enumerate(indices):
+            frames[n] = self.frame(i)
+
+        batch = {"frame": frames}
+        for name, values in self.telemetry.items():
+            batch[name] = np.asarray(values[indices])
+        return batch
+
+    # ---- loading ----
+    def permutation(self, seed=None):
+        return np.random.default_rng(seed).permutation(len(self))
+
+    def iter_batches(
+        self,
+        batch_size=32,
+        shuffle=True,
+        seed=None,
+        workers=4,
+        prefetch=2,
+        worker_id=0,
+        num_workers=1,
+        drop_last=False
+    ):
+        """
+        Yield batches (see ``batch``), optionally in a seeded random order.
+
+        ``workers`` threads read/decode batches in parallel (OpenCV and the
+        page cache release the GIL) with at most ``prefetch`` batches per
+        thread in flight. ``worker_id``/``num_workers`` split one epoch
+        between loader processes: every process uses the same ``seed`` and
+        reads a disjoint share of the permutation.
+        """
+        order = self.permutation(seed) if shuffle else np.arange(len(self))
+        order = order[worker_id::num_workers]
+
+        stop = len(order) - len(order) % batch_size if drop_last else len(order)
+        batches = [order[i:i + batch_size] for i in range(0, stop, batch_size)]
+
+        if workers <= 1:
+            for indices in batches:
+                yield self.batch(indices)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            ahead = max(workers * prefetch, 1)
+            pending = [pool.submit(self.batch, b) for b in batches[:ahead]]
+            for n in range(len(batches)):
+                batch = pending[n].result()
+                pending[n] = None
+                if n + ahead < len(batches):
+                    pending.append(pool.submit(self.batch, batches[n + ahead]))
+                yield batch
@@ -0,0 +1,189 @@
+import json
+import os
+
+import cv2
+import numpy as np
+from utilities.VideoFrameSource import VideoFrameSource
+
+
+class DatasetWriter:
+    """
+    Streams synchronized frames and telemetry into a sharded dataset.
+
+    Layout of ``out_dir``::
+
+        meta.json                dataset description (written last)
+        index.npy                per sample: shard, byte offset, byte length
+        telemetry/<column>.npy   one array per telemetry column
+        shard-00000.bin ...      frames, ``shard_size`` samples per shard
+
+    Frames are stored raw (``encoding="raw"``, fixed-size uint8 blocks) or
+    compressed with ``cv2.imencode`` (``".jpg"``, ``".png"``, ...). Frames
+    are written to the open shard as they arrive, so only the current
+    frame is ever in memory; the telemetry columns (a few numbers per
+    frame) are kept until ``close``. Frames are expected in RGB, like
+    ``TelemetryVideoSync.frames``.
+    """
+
+    FORMAT = 1
+    INDEX_DTYPE = np.dtype([("shard", np.int32), ("offset", np.int64), ("length", np.int64)])
+
+    def __init__(self, out_dir, shard_size=1024, encoding="raw", quality=95, value_dtype=np.float32):
+        self.out_dir = out_dir
+        self.shard_size = shard_size
+        self.encoding = encoding
+        self.quality = quality
+        self.value_dtype = np.dtype(value_dtype)
+
+        self.frame_shape = None
+        self.flights = []
+        self.shards = []
+        self.count = 0
+
+        self._index = []
+        self._columns = {}
+        self._shard = None
+        self._shard_offset = 0
+
+        os.makedirs(os.path.join(out_dir, "telemetry"), exist_ok=True)
+        if os.path.exists(os.path.join(out_dir, "meta.json")):
+            raise FileExistsError(f"Dataset already exists: {out_dir}")
+
+    # ---- frames ----
+    def _encode(self, frame):
+        if self.encoding == "raw":
+            return np.ascontiguousarray(frame).data
+
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        params = []
+        if self.encoding in (".jpg", ".jpeg"):
+            params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        ok, buf = cv2.imencode(self.encoding, frame, params)
+        if not ok:
+            raise ValueError(f"Could not encode frame as {self.encoding}")
+        return buf.data
+
+    def _next_shard(self):
+        if self._shard is not None:
+            self._shard.close()
+        name = f"shard-{len(self.shards):05d}.bin"
+        self._shard = open(os.path.join(self.out_dir, name), "wb")
+        self._shard_offset = 0
+        self.shards.append({"file": name, "count": 0})
+
+    # ---- samples ----
+    def add(self, frame, **telemetry):
+        """Append one frame with its telemetry values (same columns for every sample)."""
+        frame = np.asarray(frame, dtype=np.uint8)
+        if self.frame_shape is None:
+            self.frame_shape = frame.shape
+        elif frame.shape != self.frame_shape:
+            raise ValueError(f"Frame shape {frame.shape} != dataset frame shape {self.frame_shape}")
+
+        if self._columns and set(telemetry) != set(self._columns):
+            raise ValueError(f"Telemetry columns {sorted(telemetry)} != {sorted(self._columns)}")
+
+        if self._shard is None or self.shards[-1]["count"] == self.shard_size:
+            self._next_shard()
+
+        blob = self._encode(frame)
+        self._shard.write(blob)
+        self._index.append((len(self.shards) - 1, self._shard_offset, blob.nbytes))
+        self._shard_offset += blob.nbytes
+        self.shards[-1]["count"] += 1
+
+        for name, value in telemetry.items():
+            self._columns.setdefault(name, []).append(value)
+        self.count += 1
+
+    def add_flight(self, sync, name=None, extra=None, progress=True):
+        """
+        Append every synchronized frame of ``sync`` (after ``analyze_telemetry``).
+
+        Each sample gets ``flight``, ``frame_index``, ``video_time``,
+        ``telemetry_time``, ``yaw``, ``pitch``, ``roll`` and ``gps_alt``;
+        ``extra`` adds more per-frame columns (e.g. from ``align_topics``).
+        """
+        if sync.gps_time is None:
+            raise RuntimeError("Frames not aligned yet; run analyze_telemetry first")
+
+        frames = sync.frames
+        if isinstance(frames, VideoFrameSource):
+            frames = frames.prefetch()
+
+        columns = {
+            "frame_index": sync.frame_index,
+            "video_time": sync.video_time,
+            "telemetry_time": sync.gps_time,
+            "yaw": sync.yaw,
+            "pitch": sync.pitch,
+            "roll": sync.roll,
+            "gps_alt": sync.gps_alt,
+        }
+        columns.update(extra or {})
+
+        flight = len(self.flights)
+        start = self.count
+        n = min(len(v) for v in columns.values())
+        for i, frame in zip(range(n), frames):
+            self.add(frame, flight=flight, **{c: v[i] for c, v in columns.items()})
+
+        self.flights.append({
+            "name": name or os.path.basename(os.path.dirname(os.path.abspath(sync.video_path))),
+            "video": os.path.abspath(sync.video_path),
+            "start": start,
+            "count": self.count - start,
+            "fps": sync.fps,
+        })
+        if progress:
+            print(f"Added {self.count - start} samples from {self.flights[-1]['name']}")
+
+    # ---- finish ----
+    def _column_dtype(self, name, values):
+        values = np.asarray(values)
+        if name.endswith("time"):
+            return np.float64
+        if np.issubdtype(values.dtype, np.integer):
+            return np.int64
+        return self.value_dtype
+
+    def close(self):
+        if self._shard is not None:
+            self._shard.close()
+            self._shard = None
+
+        np.save(os.path.join(self.out_dir, "index.npy"), np.array(self._index, dtype=self.INDEX_DTYPE))
+
+        columns = {}
+        for name, values in self._columns.items():
+            dtype = self._column_dtype(name, values)
+            np.save(os.path.join(self.out_dir, "telemetry", f"{name}.npy"), np.asarray(values, dtype=dtype))
+            columns[name] = np.dtype(dtype).str
+
+        meta = {
+            "format": self.FORMAT,
+            "count": self.count,
+            "frame_shape": list(self.frame_shape or ()),
+            "encoding": self.encoding,
+            "shard_size": self.shard_size,
+            "shards": self.shards,
+            "columns": columns,
+            "flights": self.flights,
+        }
+        # Written last: a dataset without meta.json is incomplete
+        with open(os.path.join(self.out_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+        print(f"Dataset: {self.count} samples in {len(self.shards)} shards -> {self.out_dir}")
+        return meta
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._shard is not None:
+            self._shard.close()
+            self._shard = None
@@ -0,0 +1,195 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+
+class FrameCache:
+    """
+    On-disk cache of decoded frames stored as memory-mapped uint8 arrays.
+
+    Each entry is a single file: a fixed-size JSON header followed by the raw
+    frames and their presentation timestamps (float64 seconds), which are
+    handed back to the source so a cache hit needs no timestamp scan. Entries are keyed by the absolute video path plus the source's
+    preprocessing parameters; the header records the file size and mtime so a
+    re-recorded video is detected and re-decoded instead of served stale.
+    """
+
+    MAGIC = b"AIRTRACE-FRAMES\n"
+    HEADER_SIZE = 4096
+    SUFFIX = ".frames"
+
+    def __init__(self, cache_dir=None, max_bytes=20 * 1024 ** 3):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "airtrace", "frames")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ---- keys ----
+    @staticmethod
+    def _identity(video_path):
+        st = os.stat(video_path)
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def key(self, source):
+        params = dict(source.cache_params(), path=os.path.abspath(source.video_path))
+        blob = json.dumps(params, sort_keys=True).encode()
+        return hashlib.sha1(blob).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.SUFFIX)
+
+    # ---- header ----
+    def _read_header(self, path):
+        with open(path, "rb") as f:
+            raw = f.read(self.HEADER_SIZE)
+        if not raw.startswith(self.MAGIC):
+            return None
+        try:
+            return json.loads(raw[len(self.MAGIC):].rstrip(b" \0"))
+        except ValueError:
+            return None
+
+    def _write_header(self, f, header):
+        blob = self.MAGIC + json.dumps(header).encode()
+        if len(blob) > self.HEADER_SIZE:
+            raise ValueError("Frame cache header too large")
+        f.seek(0)
+        f.write(blob.ljust(self.HEADER_SIZE, b" "))
+
+    # ---- lookup ----
+    def get(self, source):
+        """Return the cached frames as a read-only memmap, or None on a miss."""
+        path = self._path(self.key(source))
+        if not os.path.exists(path):
+            return None
+
+        header = self._read_header(path)
+        if header is None or header["source"] != self._identity(source.video_path):
+            # Source file changed (or entry is corrupt) - drop it
+            self._remove(path)
+            return None
+
+        # Touch so eviction sees this entry as recently used
+        os.utime(path)
+
+        n = header["shape"][0]
+        if "pts_offset" in header:
+            pts = np.fromfile(path, dtype=np.float64, count=n, offset=header["pts_offset"])
+            source.frame_pts.update(zip(source.indices[:n], pts.tolist()))
+
+        if header["shape"][0] == 0:
+            return np.empty(header["shape"], dtype=np.uint8)
+
+        return np.memmap(
+            path, dtype=np.uint8, mode="r",
+            offset=self.HEADER_SIZE, shape=tuple(header["shape"])
+        )
+
+    def put(self, source, workers=1):
+        """Decode ``source`` into a new cache entry and return it memory-mapped."""
+        key = self.key(source)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+
+        shape = source.shape
+        frame_shape = shape[1:]
+        frame_bytes = int(np.prod(frame_shape))
+        header = {
+            "source": self._identity(source.video_path),
+            "params": source.cache_params(),
+            "video_path": os.path.abspath(source.video_path),
+            "fps": source.fps,
+            "shape": list(shape),
+        }
+
+        with open(tmp_path, "wb+") as f:
+            self._write_header(f, header)
+            f.truncate(self.HEADER_SIZE + frame_bytes * shape[0])
+
+        n = 0
+        try:
+            if shape[0] and workers > 1:
+                from utilities.ParallelVideoDecoder import ParallelVideoDecoder
+                n = ParallelVideoDecoder(workers).decode_into_file(source, tmp_path, self.HEADER_SIZE)
+            elif shape[0]:
+                frames = np.memmap(tmp_path, dtype=np.uint8, mode="r+", offset=self.HEADER_SIZE, shape=shape)
+                for frame in source:
+                    frames[n] = frame
+                    n += 1
+                frames.flush()
+                del frames
+
+            # Container frame counts are estimates; record what was actually decoded
+            header["shape"] = [n] + list(frame_shape)
+            header["pts_offset"] = self.HEADER_SIZE + frame_bytes * n
+            pts = source.timestamps()[:n]
+            with open(tmp_path, "rb+") as f:
+                self._write_header(f, header)
+                f.truncate(header["pts_offset"])
+                f.seek(header["pts_offset"])
+                f.write(pts.astype(np.float64).tobytes())
+
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+        self.evict(keep=path)
+        return self.get(source)
+
+    def load(self, source, workers=1):
+        frames = self.get(source)
+        if frames is None:
+            frames = self.put(source, workers=workers)
+        return frames
+
+    # ---- maintenance ----
+    @staticmethod
+    def _remove(path):
+        # Entries still mapped by another array cannot be removed on Windows
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def entries(self):
+        paths = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(self.SUFFIX)
+        ]
+        return sorted(paths, key=os.path.getmtime)
+
+    def size(self):
+        return sum(os.path.getsize(p) for p in self.entries())
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits in ``max_bytes``."""
+        entries = self.entries()
+        total = sum(os.path.getsize(p) for p in entries)
+
+        for path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            total -= os.path.getsize(path)
+            self._remove(path)
+
+    def invalidate(self, video_path=None):
+        """Drop every entry for ``video_path`` (or the whole cache). Returns the count removed."""
+        target = os.path.abspath(video_path) if video_path is not None else None
+        removed = 0
+
+        for path in self.entries():
+            if target is not None:
+                header = self._read_header(path)
+                if header is not None and header.get("video_path") != target:
+                    continue
+            if self._remove(path):
+                removed += 1
+
+        return removed
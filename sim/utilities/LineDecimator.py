@@ -0,0 +1,127 @@
+import numpy as np
+
+
+class LineDecimator:
+    """
+    Draw long time series with about as many vertices as screen pixels.
+
+    ``plot(ax, x, y)`` hands matplotlib only the visible range, reduced to
+    ``points_per_pixel`` bins per pixel column of the axes. ``"minmax"``
+    keeps the smallest and largest sample of every bin (in their original
+    order), so spikes and the envelope look exactly as with every raw
+    sample. ``"lttb"`` (Largest-Triangle-Three-Buckets) keeps one
+    representative sample per bin. Zooming, panning and resizing redo the
+    reduction for the new view, so detail comes back when zoomed in.
+
+    ``x`` must be sorted (timestamps); anything shorter than the bin count
+    is drawn unchanged.
+    """
+
+    def __init__(self, method="minmax", points_per_pixel=1.0):
+        if method not in ("minmax", "lttb"):
+            raise ValueError(f"Unknown decimation method: {method}")
+        self.method = method
+        self.points_per_pixel = points_per_pixel
+
+    # ---- reduction ----
+    @staticmethod
+    def minmax(x, y, bins):
+        """Min and max sample of each of ``bins`` equal-count bins, in index order."""
+        n = len(y)
+        if bins <= 0 or n <= 2 * bins:
+            return x, y
+
+        size = int(np.ceil(n / bins))
+        full = n // size * size
+        blocks = y[:full].reshape(-1, size)
+        starts = np.arange(0, full, size)
+
+        lo = blocks.argmin(axis=1) + starts
+        hi = blocks.argmax(axis=1) + starts
+        parts = [np.sort(np.column_stack([lo, hi]), axis=1).ravel()]
+
+        if full < n:
+            tail = y[full:]
+            parts.append(np.sort([full + tail.argmin(), full + tail.argmax()]))
+
+        # Keep the end points so the line spans the same range
+        index = np.concatenate([[0]] + parts + [[n - 1]])
+        index = index[np.r_[True, np.diff(index) != 0]]
+        return x[index], y[index]
+
+    @staticmethod
+    def lttb(x, y, n_out):
+        """Largest-Triangle-Three-Buckets: ``n_out`` samples that keep the shape of ``y``."""
+        n = len(y)
+        if n_out < 3 or n <= n_out:
+            return x, y
+
+        xf = np.asarray(x, dtype=np.float64)
+        yf = np.asarray(y, dtype=np.float64)
+        edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+        index = np.empty(n_out, dtype=np.int64)
+        index[0] = 0
+        index[-1] = n - 1
+
+        a = 0
+        for i in range(n_out - 2):
+            lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+            # Average of the next bucket (the last point for the last bucket)
+            nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+            if nhi <= nlo:
+                nlo, nhi = n - 1, n
+            cx, cy = xf[nlo:nhi].mean(), yf[nlo:nhi].mean()
+
+            # Point of this bucket spanning the largest triangle with a and c
+            area = np.abs((xf[a] - cx) * (yf[lo:hi] - yf[a]) - (xf[a] - xf[lo:hi]) * (cy - yf[a]))
+            a = lo + int(area.argmax())
+            index[i + 1] = a
+
+        return x[index], y[index]
+
+    def reduce(self, x, y, pixels):
+        bins = max(int(pixels * self.points_per_pixel), 1)
+        if self.method == "lttb":
+            return self.lttb(x, y, 2 * bins)
+        return self.minmax(x, y, bins)
+
+    # ---- matplotlib ----
+    def plot(self, ax, x, y, **kwargs):
+        """
+        ``ax.plot(x, y, **kwargs)`` with view-dependent decimation.
+
+        Returns the ``Line2D``; its data is replaced whenever the x-limits
+        or the figure size change.
+        """
+        x = np.asarray(x)
+        y = np.asarray(y)
+        if len(x) < 2 or np.any(np.diff(x) < 0):
+            # Not a time series: nothing to bin on
+            return ax.plot(x, y, **kwargs)[0]
+
+        line = ax.plot(*self.reduce(x, y, ax.bbox.width), **kwargs)[0]
+        view = {"key": None}
+
+        def update(*_):
+            x0, x1 = sorted(ax.get_xlim())
+            width = ax.bbox.width
+            key = (x0, x1, round(width))
+            if key == view["key"]:
+                return
+            view["key"] = key
+
+            # One sample beyond each edge so the line reaches the frame
+            lo = max(int(np.searchsorted(x, x0, side="left")) - 1, 0)
+            hi = min(int(np.searchsorted(x, x1, side="right")) + 1, len(x))
+            line.set_data(*self.reduce(x[lo:hi], y[lo:hi], width))
+
+        ax.callbacks.connect("xlim_changed", update)
+        ax.figure.canvas.mpl_connect("resize_event", update)
+        return line
+
+    @staticmethod
+    def stride(n, max_items=300, stride=None):
+        """Index step that keeps at most ``max_items`` of ``n`` (e.g. quiver arrows)."""
+        if stride is not None:
+            return max(int(stride), 1)
+        return max(int(np.ceil(n / max_items)), 1)
@@ -0,0 +1,165 @@
+import cv2
+import numpy as np
+
+from utilities.VideoFrameSource import VideoFrameSource
+
+
+class MotionDetector:
+    """
+    Coarse-to-fine search for the first and last moving frame of a video.
+
+    A coarse pass compares small gray frames ``coarse_step`` frames apart,
+    scanning forward from the start and backward from the end. Only around
+    the first coarse pair that looks like motion are the full-resolution
+    gray frames decoded, to find the exact frame with the same metric as
+    ``debug_detect_motion_video`` (mean ``absdiff`` of consecutive frames).
+    Each scan stops as soon as its transition is confirmed.
+    """
+
+    def __init__(
+        self,
+        video_path,
+        threshold=1,
+        min_static_frames=2,
+        coarse_step=8,
+        coarse_height=90,
+        coarse_ratio=0.5,
+        block=32
+    ):
+        self.video_path = video_path
+        self.threshold = threshold
+        self.min_static_frames = min_static_frames
+        self.coarse_step = coarse_step
+        self.coarse_ratio = coarse_ratio
+        self.block = block
+
+        self.exact = VideoFrameSource(video_path, color=cv2.COLOR_BGR2GRAY)
+        self.coarse = VideoFrameSource(video_path, color=cv2.COLOR_BGR2GRAY, target_height=coarse_height)
+        self.fps = self.exact.fps
+        self.frame_count = self.exact.frame_count
+
+        # Inspection curves: raw frame index -> motion energy
+        self.coarse_curve = {}
+        self.exact_curve = {}
+
+    # ---- passes ----
+    def _coarse_pairs(self, raw_start, raw_stop):
+        """Coarse motion between frames ``coarse_step`` apart in [raw_start, raw_stop)."""
+        frames = self.coarse.select(range(raw_start, raw_stop, self.coarse_step))
+        pairs = []
+        prev = None
+        for raw, frame in zip(frames.indices, frames.iter_frames()):
+            if prev is not None:
+                value = cv2.absdiff(frame, prev[1]).mean()
+                self.coarse_curve[raw] = value
+                pairs.append((prev[0], raw, value))
+            prev = (raw, frame)
+        return pairs
+
+    def _refine(self, raw_start, raw_stop):
+        """Exact motion for every frame pair ``(i, i + 1)`` with i in [raw_start, raw_stop)."""
+        raw_start = max(raw_start, 0)
+        motion = self.exact.select(range(raw_start, raw_stop + 1)).motion_energy()
+        for i, value in enumerate(motion):
+            self.exact_curve[raw_start + i] = value
+        return raw_start, motion
+
+    def _is_candidate(self, value):
+        return value > self.threshold * self.coarse_ratio
+
+    def find_start(self):
+        """First frame index whose exact motion exceeds the threshold, or None."""
+        span = self.coarse_step * self.block
+        for block_start in range(0, self.frame_count, span):
+            # One coarse frame of overlap so no pair straddling blocks is lost
+            pairs = self._coarse_pairs(block_start, min(block_start + span + 1, self.frame_count))
+            for a, b, value in pairs:
+                if not self._is_candidate(value):
+                    continue
+
+                first, motion = self._refine(a - self.coarse_step, b + self.coarse_step)
+                moving = np.flatnonzero(motion > self.threshold)
+                if len(moving):
+                    return first + int(moving[0])
+        return None
+
+    def find_end(self, stop_at=0):
+        """Last frame index whose exact motion exceeds the threshold, scanning back to ``stop_at``."""
+        span = self.coarse_step * self.block
+        block_stop = self.frame_count
+        while block_stop > stop_at:
+            block_start = max(block_stop - span, stop_at)
+            pairs = self._coarse_pairs(block_start, min(block_stop + 1, self.frame_count))
+            for a, b, value in reversed(pairs):
+                if not self._is_candidate(value):
+                    continue
+
+                first, motion = self._refine(a - self.coarse_step, b + self.coarse_step)
+                moving = np.flatnonzero(motion > self.threshold)
+                if len(moving):
+                    return first + int(moving[-1])
+            block_stop = block_start
+        return None
+
+    def _follow_burst(self, last_moving):
+        """
+        Extend a burst past ``last_moving`` in exact chunks of ``coarse_step`` pairs.
+
+        Stops at the first chunk without motion, so only the burst itself
+        plus one coarse step is decoded at full resolution.
+        """
+        while True:
+            stop = min(last_moving + 1 + self.coarse_step, self.frame_count - 1)
+            if stop <= last_moving + 1:
+                return last_moving
+
+            first, motion = self._refine(last_moving + 1, stop)
+            moving = np.flatnonzero(motion > self.threshold)
+            if not len(moving):
+                return last_moving
+            last_moving = first + int(moving[-1])
+
+    def _find_end_after_start(self):
+        """
+        Last moving frame, given that ``find_start`` already refined the window around the start.
+
+        The backward scan only covers what comes after the last moving frame
+        of that window, so its coarse grid cannot step over a short burst the
+        start search has already seen. If the coarse grid finds nothing there,
+        that burst may still run on inside the grid's first step; it is
+        followed exactly, one ``coarse_step`` at a time, instead of decoding
+        the whole tail.
+        """
+        known_end = max(i for i, value in self.exact_curve.items() if value > self.threshold)
+
+        end = self.find_end(stop_at=known_end + 1)
+        if end is not None:
+            return end
+        return self._follow_burst(known_end)
+
+    def detect(self):
+        """
+        Returns ``(start_frame, end_frame, curve)``.
+
+        ``start_frame``/``end_frame`` follow ``debug_detect_motion_video``
+        (0 when no motion is found; ``end_frame`` includes
+        ``min_static_frames``). ``curve`` is ``{"coarse": (idx, energy),
+        "exact": (idx, energy)}`` with the raw frame indices that were
+        actually evaluated.
+        """
+        self.coarse_curve = {}
+        self.exact_curve = {}
+
+        start = self.find_start()
+        if start is None:
+            start_frame, end_frame = 0, 0
+        else:
+            start_frame = start
+            end_frame = self._find_end_after_start() + self.min_static_frames
+
+        curve = {}
+        for name, values in (("coarse", self.coarse_curve), ("exact", self.exact_curve)):
+            idx = np.array(sorted(values), dtype=int)
+            curve[name] = (idx, np.array([values[i] for i in idx]))
+
+        return start_frame, end_frame, curve
@@ -0,0 +1,162 @@
+import queue
+import threading
+import time
+
+import cv2
+
+from utilities.Profiler import profiler
+
+
+class OverlayRenderer:
+    """
+    Draws per-frame text on BGR frames and shows or writes them.
+
+    ``export`` hands the annotated frames to a ``cv2.VideoWriter`` running
+    on a background thread through a bounded queue, so encoding overlaps
+    with decoding/drawing without holding more than ``queue_size`` frames.
+    ``play`` paces the frames against a monotonic clock: every frame has a
+    deadline ``start + i / fps`` (no accumulated drift), and frames that are
+    already a full period late are dropped instead of slowing playback down.
+
+    Frames are expected in OpenCV's native BGR order, so nothing is
+    converted on the way to the window or the file.
+    """
+
+    def __init__(
+        self,
+        fps,
+        position=(20, 40),
+        font=cv2.FONT_HERSHEY_SIMPLEX,
+        font_scale=0.7,
+        color=(0, 255, 0),
+        thickness=2
+    ):
+        self.fps = fps
+        self.position = position
+        self.font = font
+        self.font_scale = font_scale
+        self.color = color
+        self.thickness = thickness
+
+        self.shown = 0
+        self.dropped = 0
+        self.written = 0
+
+    def draw(self, frame, text):
+        """Draw ``text`` on ``frame`` in place (the frame is not copied)."""
+        with profiler.span("render"):
+            cv2.putText(
+                frame,
+                text,
+                self.position,
+                self.font,
+                self.font_scale,
+                self.color,
+                self.thickness
+            )
+        return frame
+
+    # ---- playback ----
+    def play(self, frames, texts, window_name="Telemetry Video", realtime=True):
+        """
+        Show ``frames`` annotated with ``texts`` (iterables of equal length).
+
+        With ``realtime`` frames are shown at ``fps`` and late frames are
+        skipped; otherwise every frame is shown as fast as it is decoded.
+        Press ``q`` to stop.
+        """
+        period = 1.0 / self.fps
+        start = None
+        self.shown = 0
+        self.dropped = 0
+
+        try:
+            for i, (frame, text) in enumerate(zip(frames, texts)):
+                if start is None:
+                    start = time.monotonic()
+                deadline = start + i * period
+
+                if realtime and time.monotonic() - deadline > period:
+                    # Already behind by a whole frame: skip it to catch up
+                    self.dropped += 1
+                    profiler.count("frames_dropped")
+                    continue
+
+                cv2.imshow(window_name, self.draw(frame, text))
+                self.shown += 1
+                profiler.count("frames_shown")
+
+                wait = deadline + period - time.monotonic() if realtime else 0
+                if cv2.waitKey(max(int(wait * 1000), 1)) & 0xFF == ord("q"):
+                    break
+        finally:
+            cv2.destroyAllWindows()
+
+        print(f"Shown {self.shown} frames, dropped {self.dropped}")
+
+    # ---- export ----
+    def export(self, frames, texts, output_path, fourcc="mp4v", queue_size=16, show=False, window_name="Telemetry Video"):
+        """
+        Write annotated ``frames`` to ``output_path``.
+
+        Encoding runs on a writer thread fed through a queue of at most
+        ``queue_size`` frames. ``show=False`` is headless (no window, works
+        without a display); ``show=True`` also previews every frame.
+        """
+        pending = queue.Queue(maxsize=max(queue_size, 1))
+        done = object()
+        failure = []
+        writer = None
+        thread = None
+
+        def write():
+            try:
+                while True:
+                    item = pending.get()
+                    if item is done:
+                        return
+                    with profiler.span("encode"):
+                        writer.write(item)
+                    self.written += 1
+                    profiler.count("frames_written")
+            except Exception as exc:
+                failure.append(exc)
+                # Keep draining so the producer never blocks on a dead writer
+                while pending.get() is not done:
+                    pass
+
+        self.written = 0
+        try:
+            for frame, text in zip(frames, texts):
+                if writer is None:
+                    h, w = frame.shape[:2]
+                    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*fourcc), self.fps, (w, h))
+                    if not writer.isOpened():
+                        raise IOError(f"Cannot open video writer: {output_path}")
+                    thread = threading.Thread(target=write, daemon=True)
+                    thread.start()
+
+                if failure:
+                    break
+
+                frame = self.draw(frame, text)
+                pending.put(frame)
+
+                if show:
+                    cv2.imshow(window_name, frame)
+                    if cv2.waitKey(1) & 0xFF == ord("q"):
+                        break
+        finally:
+            if thread is not None:
+                pending.put(done)
+                thread.join()
+            if writer is not None:
+                writer.release()
+            if show:
+                cv2.destroyAllWindows()
+
+        if failure:
+            raise failure[0]
+
+        print(f"Wrote {self.written} frames to {output_path}")
+        return output_path
@@ -0,0 +1,180 @@
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from utilities.TelemetryStore import TelemetryStore
+from utilities.Profiler import profiler
+
+
+class PX4TelemetryReader:
+    """
+    Data-only access to exported PX4 topics (no matplotlib).
+
+    Topics are read on first use, only the columns a caller asks for are
+    parsed, and parsed topics are memoized in a small LRU so repeated calls
+    in a notebook session do not touch the disk again. A cached topic is
+    re-read if its file changes.
+    """
+
+    def __init__(self, csv_dir: str, max_cached_topics=8):
+        self.csv_dir = Path(csv_dir)
+        self.store = TelemetryStore(csv_dir)
+        self.max_cached_topics = max_cached_topics
+        self._cache = OrderedDict()
+
+    # ---- loading ----
+    def _load_csv(self, filename):
+        path = self.csv_dir / filename
+        if not path.exists():
+            raise FileNotFoundError(f"CSV not found: {path}")
+        import pandas as pd
+        df = pd.read_csv(path)
+
+        if "time" not in df.columns:
+            if "timestamp" in df.columns:
+                df["time"] = df["timestamp"] / 1e6
+            else:
+                df["time"] = np.arange(len(df))
+
+        return df
+
+    def _source(self, topic):
+        if self.store.exists(topic):
+            return self.store.path(topic)
+
+        path = self.csv_dir / f"{topic}.csv"
+        if not path.exists():
+            raise FileNotFoundError(f"Topic not found: {self.csv_dir / topic}")
+        return str(path)
+
+    def _read_columns(self, path, columns):
+        topic = os.path.basename(path)
+        if path.endswith(TelemetryStore.SUFFIX):
+            with profiler.span("npy_load", topic=topic):
+                table = np.load(path, mmap_mode="r")
+                available = table.dtype.names
+                return {c: table[c] for c in columns if c in available}, len(table)
+
+        # pandas is only needed for CSV exports
+        import pandas as pd
+
+        with profiler.span("csv_parse", topic=topic):
+            available = pd.read_csv(path, nrows=0).columns
+            usecols = [c for c in available if c in columns]
+            dtype = {c: (np.int64 if c == "timestamp" else np.float64) for c in usecols}
+            df = pd.read_csv(path, usecols=usecols, dtype=dtype)
+            profiler.count("csv_rows", len(df))
+            return {c: df[c].to_numpy() for c in usecols}, len(df)
+
+    def _columns(self, path):
+        if path.endswith(TelemetryStore.SUFFIX):
+            return list(np.load(path, mmap_mode="r").dtype.names)
+        import pandas as pd
+        return list(pd.read_csv(path, nrows=0).columns)
+
+    def topics(self):
+        """Names of every exported topic (binary or CSV)."""
+        names = {p.stem for p in self.csv_dir.glob("*.csv")}
+        names.update(self.store.topics() if self.csv_dir.exists() else [])
+        return sorted(names)
+
+    def load_topic(self, topic, columns=None):
+        """
+        Requested ``columns`` of ``topic`` as a dict of NumPy arrays.
+
+        ``topic`` is ``"sensor_accel_0"`` (a trailing ``.csv`` is ignored).
+        ``"time"`` is derived from ``timestamp`` (seconds) when the file has
+        no such column. ``columns=None`` loads every column.
+        """
+        topic = os.path.splitext(topic)[0]
+        path = self._source(topic)
+        mtime = os.path.getmtime(path)
+        if columns is None:
+            columns = self._columns(path)
+            if "time" not in columns:
+                columns.append("time")
+
+        entry = self._cache.get(topic)
+        if entry is None or entry[0] != (path, mtime):
+            entry = ((path, mtime), {})
+            self._cache[topic] = entry
+        self._cache.move_to_end(topic)
+
+        cached = entry[1]
+        missing = [c for c in columns if c not in cached]
+        if missing:
+            wanted = set(missing)
+            if "time" in wanted:
+                wanted.add("timestamp")
+
+            data, n = self._read_columns(path, wanted)
+            if "time" in missing and "time" not in data:
+                if "timestamp" in data:
+                    data["time"] = data["timestamp"] / 1e6
+                else:
+                    data["time"] = np.arange(n)
+
+            for c in missing:
+                if c not in data:
+                    raise KeyError(f"Column {c!r} not found in {path}")
+            cached.update(data)
+
+        while len(self._cache) > self.max_cached_topics:
+            self._cache.popitem(last=False)
+
+        return {c: cached[c] for c in columns}
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    # ---- topics ----
+    def accelerometer(self):
+        data = self.load_topic("sensor_accel_0", ["time", "x", "y", "z"])
+        return data["time"], data["x"], data["y"], data["z"]
+
+    def gyroscope(self):
+        data = self.load_topic("sensor_gyro_0", ["time", "x", "y", "z"])
+        return data["time"], np.degrees(data["x"]), np.degrees(data["y"]), np.degrees(data["z"])
+
+    def magnetometer(self):
+        data = self.load_topic("sensor_mag_0", ["time", "x", "y", "z"])
+        x, y, z = data["x"], data["y"], data["z"]
+        total_field = np.sqrt(x**2 + y**2 + z**2)
+        heading = np.degrees(np.arctan2(y, x))
+        return data["time"], x, y, z, total_field, heading
+
+    def baro(self):
+        data = self.load_topic("sensor_baro_0", ["time", "pressure", "temperature"])
+        return data["time"], data["pressure"], data["temperature"]
+
+    def gps(self):
+        data = self.load_topic("sensor_gps_0", ["time", "longitude_deg", "latitude_deg", "altitude_msl_m"])
+        return data["time"], data["longitude_deg"], data["latitude_deg"], data["altitude_msl_m"]
+
+    @staticmethod
+    def quat_to_euler(q0, q1, q2, q3):
+        roll = np.arctan2(2*(q0*q1 + q2*q3), 1 - 2*(q1*q1 + q2*q2))
+        pitch = np.arcsin(2*(q0*q2 - q3*q1))
+        yaw = np.arctan2(2*(q0*q3 + q1*q2), 1 - 2*(q2*q2 + q3*q3))
+        return np.degrees(roll), np.degrees(pitch), np.degrees(yaw)
+
+    def attitude_quaternions(self):
+        data = self.load_topic("vehicle_attitude_0", ["time", "q[0]", "q[1]", "q[2]", "q[3]"])
+        return data["time"], data["q[0]"], data["q[1]"], data["q[2]"], data["q[3]"]
+
+    def attitude_angles(self):
+        time, q0, q1, q2, q3 = self.attitude_quaternions()
+        roll, pitch, yaw = self.quat_to_euler(q0, q1, q2, q3)
+        return time, roll, pitch, yaw
+
+    def load_all(self):
+        return {
+            "acc": self.accelerometer(),
+            "gyro": self.gyroscope(),
+            "mag": self.magnetometer(),
+            "baro": self.baro(),
+            "gps": self.gps(),
+            "att": self.attitude_angles()
+        }
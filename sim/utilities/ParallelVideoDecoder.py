@@ -0,0 +1,202 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utilities.VideoFrameSource import VideoFrameSource
+
+
+def probe_keyframes(video_path):
+    """
+    Raw frame indices of the keyframes in ``video_path``.
+
+    Uses ffprobe (only keyframes are decoded, so it is quick). Returns None
+    when ffprobe is not installed or the probe fails.
+    """
+    if shutil.which("ffprobe") is None:
+        return None
+
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-skip_frame", "nokey", "-show_entries", "frame=pts_time",
+        "-of", "csv=p=0", video_path
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    times = np.array([float(line.strip(",")) for line in out.split() if line.strip(",")])
+    if len(times) == 0:
+        return None
+
+    fps = VideoFrameSource(video_path).fps
+    return np.unique(np.round((times - times[0]) * fps).astype(int))
+
+
+def _open_segment(video_path, params, start, stop):
+    source = VideoFrameSource(
+        video_path,
+        color=params["color"],
+        target_height=params["target_height"],
+        cut_pixels=params["cut_pixels"]
+    )
+    return source.select(range(start, stop, params["step"]))
+
+
+def _decode_segment(video_path, params, raw_start, raw_stop, pos, out):
+    """Worker: decode one segment into the shared output file at ``pos``; returns (count, frame_pts)."""
+    path, offset, shape = out[0], out[1], tuple(out[2])
+    frames = np.memmap(path, dtype=np.uint8, mode="r+", offset=offset, shape=shape)
+
+    segment = _open_segment(video_path, params, raw_start, raw_stop)
+    n = 0
+    for frame in segment:
+        frames[pos + n] = frame
+        n += 1
+
+    frames.flush()
+    del frames
+    return n, segment.frame_pts
+
+
+def _motion_segment(video_path, params, raw_start, raw_stop):
+    """Worker: motion energy over one segment; returns (energy, frame_pts)."""
+    segment = _open_segment(video_path, params, raw_start, raw_stop)
+    return segment.motion_energy(), segment.frame_pts
+
+
+class ParallelVideoDecoder:
+    """
+    Decode a VideoFrameSource with several worker processes.
+
+    The source's frame range is split into contiguous segments whose starts
+    sit on keyframes (when ffprobe is available), so each worker seeks
+    straight to a keyframe and never decodes frames that belong to another
+    segment. Workers run the same preprocessing as the serial path and
+    write into one memory-mapped file, so the result is byte-identical to
+    ``VideoFrameSource.to_array()``.
+    """
+
+    def __init__(self, workers=None, use_keyframes=True):
+        self.workers = workers or os.cpu_count() or 1
+        self.use_keyframes = use_keyframes
+
+    def segments(self, source, overlap=0):
+        """
+        Split ``source`` into ``(raw_start, raw_stop, pos)`` tuples.
+
+        ``pos`` is the output position of each segment's first frame.
+        ``overlap`` extends every segment but the first backwards by that many
+        frames (used for frame differences).
+        """
+        indices = source.indices
+        n = len(indices)
+        if n == 0:
+            return []
+
+        count = max(1, min(self.workers, n))
+        bounds = [round(i * n / count) for i in range(count + 1)]
+
+        keyframes = probe_keyframes(source.video_path) if self.use_keyframes else None
+        if keyframes is not None and len(keyframes):
+            # Move each inner boundary to the first output frame at or after the nearest keyframe
+            raw = np.asarray(indices)
+            for i in range(1, count):
+                wanted = indices[bounds[i]]
+                k = keyframes[np.argmin(np.abs(keyframes - wanted))]
+                bounds[i] = int(np.searchsorted(raw, k))
+            bounds = sorted(set(min(max(b, 0), n) for b in bounds))
+
+        segments = []
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            if b <= a:
+                continue
+            start = max(a - overlap, 0)
+            segments.append((indices[start], indices[b - 1] + 1, start))
+
+        return segments
+
+    def _run(self, fn, jobs):
+        if self.workers <= 1 or len(jobs) <= 1:
+            return [fn(*job) for job in jobs]
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+            futures = [pool.submit(fn, *job) for job in jobs]
+            return [f.result() for f in futures]
+
+    def _decode(self, source, out):
+        params = source.cache_params()
+        segments = self.segments(source)
+        jobs = [
+            (source.video_path, params, raw_start, raw_stop, pos, out)
+            for raw_start, raw_stop, pos in segments
+        ]
+        results = self._run(_decode_segment, jobs)
+        counts = [count for count, _ in results]
+        # Keep the workers' frame timestamps so source.timestamps() needs no rescan
+        for _, pts in results:
+            source.frame_pts.update(pts)
+
+        # Frame counts from the container are estimates: keep the contiguous decoded prefix
+        n = 0
+        for (_, _, pos), count in zip(segments, counts):
+            if pos != n:
+                break
+            n = pos + count
+        return n
+
+    def decode(self, source, path=None):
+        """
+        Decode ``source`` into a file-backed ``np.memmap`` owned by the caller.
+
+        Workers write straight into the mapped file, so the frames exist
+        once (in the page cache) instead of in a shared block plus a copy.
+        With ``path`` the file is kept there; otherwise a temporary file is
+        used and unlinked once mapped, so it disappears with the array.
+        """
+        shape = source.shape
+        nbytes = max(int(np.prod(shape)), 1)
+
+        if path is None:
+            fd, tmp_path = tempfile.mkstemp(suffix=".frames")
+        else:
+            fd, tmp_path = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644), path
+        try:
+            os.ftruncate(fd, nbytes)
+        finally:
+            os.close(fd)
+
+        try:
+            n = self._decode(source, (tmp_path, 0, shape))
+            frames = np.memmap(tmp_path, dtype=np.uint8, mode="r+", shape=shape)
+        finally:
+            if path is None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    # Windows keeps mapped files; the temp dir cleanup removes it
+                    pass
+
+        # Container frame counts are estimates: drop slots that never filled
+        return frames[:n] if n < len(frames) else frames
+
+    def decode_into_file(self, source, path, offset=0):
+        """Decode ``source`` into an existing file of ``source.shape`` bytes at ``offset``."""
+        return self._decode(source, (path, offset, source.shape))
+
+    def motion_energy(self, source):
+        """Parallel version of ``VideoFrameSource.motion_energy``."""
+        params = source.cache_params()
+        jobs = [
+            (source.video_path, params, raw_start, raw_stop)
+            for raw_start, raw_stop, _ in self.segments(source, overlap=1)
+        ]
+        results = self._run(_motion_segment, jobs)
+        parts = [energy for energy, _ in results]
+        for _, pts in results:
+            source.frame_pts.update(pts)
+        return np.concatenate(parts) if parts else np.array([])
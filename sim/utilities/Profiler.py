@@ -0,0 +1,269 @@
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "start", "mem_start", "carry")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.profiler._enter(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler._exit(self)
+
+
+class Profiler:
+    """
+    Named spans and counters for the pipeline stages.
+
+    The pipeline code is instrumented against the shared ``profiler``
+    instance of this module::
+
+        with profiler.span("decode"):
+            ok, frame = cap.read()
+        profiler.count("frames")
+
+    Disabled (the default), ``span`` returns one shared no-op context and
+    ``count`` returns immediately, so instrumented code costs about a method
+    call. ``enable()`` starts recording: every span becomes a timeline
+    event (per thread, nested spans allowed) and is aggregated per name;
+    with ``memory=True`` each span also records its peak traced memory
+    above the level it started at (``tracemalloc``: Python and NumPy
+    allocations, including OpenCV outputs; the peak is process-wide, so
+    spans overlapping on other threads share it). Export with ``save_json`` or
+    ``save_chrome_trace`` (open in ``chrome://tracing`` or Perfetto).
+    """
+
+    _NULL = contextlib.nullcontext()
+
+    def __init__(self, enabled=False, memory=False, max_events=1_000_000, counter_interval=0.01):
+        self.enabled = False
+        self.memory = False
+        self.max_events = max_events
+        self.counter_interval = counter_interval
+
+        self._own_tracemalloc = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+        if enabled:
+            self.enable(memory)
+
+    # ---- control ----
+    def reset(self):
+        with self._lock:
+            self.origin = time.perf_counter()
+            self.events = []
+            self.dropped_events = 0
+            self.memory_tracked = self.memory
+            self.stages = {}
+            self.counters = {}
+            self._counter_samples = []
+            self._last_sample = {}
+
+    def enable(self, memory=False):
+        self.memory = memory
+        self.memory_tracked = self.memory_tracked or memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracemalloc = True
+        self.enabled = True
+        return self
+
+    def disable(self):
+        self.enabled = False
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+            self._own_tracemalloc = False
+        self.memory = False
+        return self
+
+    @contextlib.contextmanager
+    def session(self, memory=False, json_path=None, trace_path=None):
+        """Record everything inside the block (fresh data), then export and disable."""
+        self.reset()
+        self.enable(memory)
+        try:
+            yield self
+        finally:
+            self.disable()
+            if json_path:
+                self.save_json(json_path)
+            if trace_path:
+                self.save_chrome_trace(trace_path)
+
+    # ---- recording ----
+    def span(self, name, **args):
+        """Context manager timing ``name``; ``args`` end up in the trace event."""
+        if not self.enabled:
+            return self._NULL
+        return _Span(self, name, args)
+
+    def trace(self, name=None):
+        """Decorator: run the function inside ``span(name)`` (default: its qualified name)."""
+        def decorator(fn):
+            span_name = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Span(self, span_name, {}):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, value=1):
+        """Add ``value`` to counter ``name`` (frames, bytes, dropped frames, ...)."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            total = self.counters.get(name, 0) + value
+            self.counters[name] = total
+            # Timeline samples are throttled so per-frame counters stay small
+            if now - self._last_sample.get(name, -1.0) >= self.counter_interval:
+                self._last_sample[name] = now
+                self._counter_samples.append((name, now, total))
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, span):
+        stack = self._stack()
+        span.carry = 0
+        span.mem_start = None
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # Keep the parent's peak so far before the child resets it
+                stack[-1].carry = max(stack[-1].carry, peak)
+            tracemalloc.reset_peak()
+            span.mem_start = current
+        stack.append(span)
+        span.start = time.perf_counter()
+
+    def _exit(self, span):
+        end = time.perf_counter()
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+
+        peak = None
+        if span.mem_start is not None and tracemalloc.is_tracing():
+            top = max(tracemalloc.get_traced_memory()[1], span.carry)
+            peak = max(top - span.mem_start, 0)
+            if stack:
+                stack[-1].carry = max(stack[-1].carry, top)
+
+        duration = end - span.start
+        with self._lock:
+            stage = self.stages.get(span.name)
+            if stage is None:
+                stage = self.stages[span.name] = {
+                    "calls": 0, "total_s": 0.0, "min_s": float("inf"), "max_s": 0.0, "peak_bytes": 0
+                }
+            stage["calls"] += 1
+            stage["total_s"] += duration
+            stage["min_s"] = min(stage["min_s"], duration)
+            stage["max_s"] = max(stage["max_s"], duration)
+            if peak is not None:
+                stage["peak_bytes"] = max(stage["peak_bytes"], peak)
+
+            if len(self.events) < self.max_events:
+                self.events.append((span.name, span.start, duration, threading.get_ident(), peak, span.args))
+            else:
+                self.dropped_events += 1
+
+    # ---- reporting ----
+    def summary(self):
+        """Per-stage totals (sorted by total time) and counter totals."""
+        with self._lock:
+            stages = {
+                name: dict(
+                    s,
+                    mean_s=s["total_s"] / s["calls"],
+                    peak_mb=s["peak_bytes"] / 1024 ** 2,
+                )
+                for name, s in sorted(self.stages.items(), key=lambda kv: -kv[1]["total_s"])
+            }
+            return {
+                "wall_s": time.perf_counter() - self.origin,
+                "memory_tracked": self.memory_tracked,
+                "stages": stages,
+                "counters": dict(self.counters),
+                "dropped_events": self.dropped_events,
+            }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"{'stage':<24} {'calls':>8} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'peak MB':>9}")
+        for name, s in summary["stages"].items():
+            print(
+                f"{name:<24} {s['calls']:>8} {s['total_s']:>9.3f} {s['mean_s'] * 1e3:>9.3f} "
+                f"{s['max_s'] * 1e3:>9.3f} {s['peak_mb']:>9.1f}"
+            )
+        for name, value in summary["counters"].items():
+            print(f"{name:<24} {value:>8}")
+
+    def save_json(self, path):
+        """Write ``summary()`` as JSON."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+    def chrome_trace(self):
+        """Trace Event Format dict: one complete event per span, counter tracks for counters."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            samples = list(self._counter_samples)
+            counters = dict(self.counters)
+        end = time.perf_counter()
+
+        trace = []
+        for name, start, duration, tid, peak, args in events:
+            event_args = dict(args)
+            if peak is not None:
+                event_args["peak_mb"] = round(peak / 1024 ** 2, 3)
+            trace.append({
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": event_args,
+            })
+        for name, t, total in samples:
+            trace.append({"name": name, "ph": "C", "ts": (t - self.origin) * 1e6, "pid": pid, "args": {name: total}})
+        # Final value of every counter at the end of the timeline
+        for name, total in counters.items():
+            trace.append({"name": name, "ph": "C", "ts": (end - self.origin) * 1e6, "pid": pid, "args": {name: total}})
+
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+
+# Shared instance the pipeline modules are instrumented against
+profiler = Profiler()
@@ -0,0 +1,204 @@
+import numpy as np
+
+
+class SyncEstimator:
+    """
+    Estimate the video -> PX4 clock mapping from the signals themselves.
+
+    A cheap video motion-energy curve (mean frame difference) and an IMU
+    activity signal (e.g. gyro magnitude) are resampled onto a common low-rate
+    grid, normalized, and cross-correlated with an FFT. The peak gives the
+    offset; repeating the correlation on a few windows and fitting a line
+    through the per-window offsets gives the clock-rate drift. The result is
+    ``telemetry_time = offset + scale * video_time``.
+
+    Drift is only fitted when at least ``min_drift_windows`` windows match
+    with a score of ``min_window_score`` or more and their centres span
+    ``min_drift_span`` seconds; otherwise windows without usable motion
+    would tilt the line, so ``scale`` stays 1 and only the offset is used.
+    """
+
+    def __init__(
+        self,
+        rate=20.0,
+        max_lag=None,
+        drift_windows=4,
+        window_lag=2.0,
+        min_window_score=0.5,
+        min_drift_windows=3,
+        min_drift_span=60.0
+    ):
+        # max_lag bounds |offset| in seconds (None = search every overlap)
+        self.rate = rate
+        self.max_lag = max_lag
+        self.drift_windows = drift_windows
+        self.window_lag = window_lag
+        self.min_window_score = min_window_score
+        self.min_drift_windows = min_drift_windows
+        self.min_drift_span = min_drift_span
+
+    # ---- signal preparation ----
+    def resample(self, time, values, t0, t1):
+        time = np.asarray(time, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        grid = np.arange(t0, t1, 1.0 / self.rate)
+
+        # Average everything that falls into each grid cell so high-rate
+        # signals are not aliased, then fill empty cells by interpolation
+        edges = np.append(grid, grid[-1] + 1.0 / self.rate) if len(grid) else grid
+        bins = np.searchsorted(edges, time, side="right") - 1
+        valid = (bins >= 0) & (bins < len(grid))
+        sums = np.bincount(bins[valid], weights=values[valid], minlength=len(grid))
+        counts = np.bincount(bins[valid], minlength=len(grid))
+
+        filled = counts > 0
+        out = np.empty(len(grid))
+        out[filled] = sums[filled] / counts[filled]
+        if filled.any() and not filled.all():
+            out[~filled] = np.interp(grid[~filled], grid[filled], out[filled])
+        elif not filled.any():
+            out[:] = 0.0
+        return grid, out
+
+    @staticmethod
+    def normalize(x):
+        x = x - np.mean(x)
+        std = np.std(x)
+        return x / std if std > 0 else x
+
+    # ---- correlation ----
+    def correlate(self, a, b, lag_range=None):
+        """
+        Lag (in samples, fractional) at which ``b`` best matches ``a``.
+
+        A positive lag means ``a[n]`` lines up with ``b[n + lag]``; only lags
+        within ``lag_range = (lo, hi)`` are considered. Returns
+        ``(lag, score)`` where ``score`` is the correlation coefficient at the peak.
+        """
+        n = len(a) + len(b) - 1
+        size = 1 << (n - 1).bit_length()
+
+        spectrum = np.conj(np.fft.rfft(a, size)) * np.fft.rfft(b, size)
+        xcorr = np.fft.irfft(spectrum, size)
+
+        # Reorder so index i corresponds to lag i - (len(a) - 1)
+        lags = np.arange(-(len(a) - 1), len(b))
+        xcorr = np.concatenate([xcorr[size - (len(a) - 1):], xcorr[:len(b)]])
+
+        if lag_range is not None:
+            keep = (lags >= lag_range[0]) & (lags <= lag_range[1])
+            lags, xcorr = lags[keep], xcorr[keep]
+
+        k = int(np.argmax(xcorr))
+        peak = int(lags[k])
+
+        # Parabolic refinement around the peak for sub-sample resolution
+        frac = 0.0
+        if 0 < k < len(xcorr) - 1:
+            y0, y1, y2 = xcorr[k - 1], xcorr[k], xcorr[k + 1]
+            denom = y0 - 2 * y1 + y2
+            if denom != 0:
+                frac = 0.5 * (y0 - y2) / denom
+
+        # Pearson correlation of the overlapping parts at the integer peak
+        lo = max(0, -peak)
+        hi = min(len(a), len(b) - peak)
+        score = 0.0
+        if hi - lo > 1:
+            sa, sb = a[lo:hi], b[lo + peak:hi + peak]
+            if np.std(sa) > 0 and np.std(sb) > 0:
+                score = float(np.corrcoef(sa, sb)[0, 1])
+        return peak + frac, score
+
+    # ---- estimation ----
+    def _offset(self, video_time, video_signal, imu_time, imu_signal, offset_range=None):
+        vg, v = self.resample(video_time, video_signal, video_time[0], video_time[-1])
+        ig, g = self.resample(imu_time, imu_signal, imu_time[0], imu_time[-1])
+        if len(v) < 2 or len(g) < 2:
+            return None, 0.0
+
+        # offset = ig[0] + lag / rate - vg[0]  ->  allowed lags in samples
+        lag_range = None
+        if offset_range is not None:
+            base = ig[0] - vg[0]
+            lag_range = (
+                np.floor((offset_range[0] - base) * self.rate),
+                np.ceil((offset_range[1] - base) * self.rate)
+            )
+
+        lag, score = self.correlate(self.normalize(v), self.normalize(g), lag_range)
+        return ig[0] + lag / self.rate - vg[0], score
+
+    def estimate(self, video_time, video_signal, imu_time, imu_signal):
+        """
+        Returns a dict with ``offset``, ``scale``, ``score``, the per-window
+        ``window_offsets`` (``(video_time, offset, score)`` rows),
+        ``drift_fitted`` and ``residual``: the weighted RMS (s) of the good
+        windows' offsets around the fitted mapping (None without good windows).
+        """
+        video_time = np.asarray(video_time, dtype=np.float64)
+        video_signal = np.asarray(video_signal, dtype=np.float64)
+        imu_time = np.asarray(imu_time, dtype=np.float64)
+        imu_signal = np.asarray(imu_signal, dtype=np.float64)
+
+        offset_range = None
+        if self.max_lag is not None:
+            offset_range = (-self.max_lag, self.max_lag)
+
+        offset, score = self._offset(video_time, video_signal, imu_time, imu_signal, offset_range)
+        if offset is None:
+            raise ValueError("Signals too short to estimate a time offset")
+
+        # Drift: refine the offset on consecutive windows of the video
+        windows = []
+        if self.drift_windows > 1:
+            edges = np.linspace(video_time[0], video_time[-1], self.drift_windows + 1)
+            for a, b in zip(edges[:-1], edges[1:]):
+                sel = (video_time >= a) & (video_time <= b)
+                if sel.sum() < 2 * self.rate:
+                    continue
+
+                # Only the telemetry around the coarse match takes part
+                lo = a + offset - self.window_lag
+                hi = b + offset + self.window_lag
+                imu_sel = (imu_time >= lo) & (imu_time <= hi)
+                if imu_sel.sum() < 2:
+                    continue
+
+                w_offset, w_score = self._offset(
+                    video_time[sel], video_signal[sel],
+                    imu_time[imu_sel], imu_signal[imu_sel],
+                    (offset - self.window_lag, offset + self.window_lag)
+                )
+                if w_offset is not None:
+                    windows.append((0.5 * (a + b), w_offset, w_score))
+
+        good = [w for w in windows if w[2] >= self.min_window_score]
+        centers = np.array([w[0] for w in good])
+        offsets = np.array([w[1] for w in good])
+        weights = np.array([w[2] for w in good])
+
+        scale = 1.0
+        drift_fitted = (
+            len(good) >= max(self.min_drift_windows, 2)
+            and centers.max() - centers.min() >= self.min_drift_span
+        )
+        if drift_fitted:
+            # telemetry = video + offset(t) with offset(t) = a + b * t  =>  scale = 1 + b
+            b, a = np.polyfit(centers, offsets, 1, w=weights)
+            scale = 1.0 + b
+            offset = a
+
+        residual = None
+        if len(good):
+            predicted = offset + (scale - 1.0) * centers
+            residual = float(np.sqrt(np.average((offsets - predicted) ** 2, weights=weights)))
+
+        return {
+            "offset": float(offset),
+            "scale": float(scale),
+            "score": float(score),
+            "window_offsets": windows,
+            "drift_fitted": bool(drift_fitted),
+            "residual": residual,
+        }
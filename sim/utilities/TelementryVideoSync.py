@@ -1,10 +1,15 @@
-from pyulog import ULog
-import pandas as pd
 import os
-import cv2
 import numpy as np
-from utilities.PX4CSVPlotter import PX4CSVPlotter
-from tqdm import tqdm
+from utilities.PX4TelemetryReader import PX4TelemetryReader
+from utilities.TelemetryStore import TelemetryStore
+from utilities.TelemetryAligner import TelemetryAligner
+from utilities.SyncEstimator import SyncEstimator
+from utilities.TelemetryTrack import TelemetryTrack
+from utilities.Profiler import profiler
+
+# Video, ULog, pandas and rendering modules (cv2, pyulog, pandas, tqdm) are
+# imported inside the methods that use them, so a worker that only extracts
+# and aligns telemetry loads NumPy and nothing else.
 
 
 class TelemetryVideoSync:
@@ -18,7 +23,9 @@ class TelemetryVideoSync:
         ulog_path,
         csv_path,
         save_every_n=1,
-        plot_every_n=10
+        plot_every_n=10,
+        frame_cache=None,
+        workers=1
     ):
 
         self.telemetry_start_idx = telemetry_start_idx
@@ -31,152 +38,308 @@ class TelemetryVideoSync:
         self.fps = 19.5
         self.save_every_n = save_every_n
         self.plot_every_n = plot_every_n
+        self.frame_cache = frame_cache
+        self.workers = workers
+        self.telemetry = PX4TelemetryReader(csv_path)
 
-        self.frames = None
-        self.gps_alt = None
-        self.gps_time = None
-        self.yaw = None
-        self.pitch = None
-        self.roll = None
-
+        # telemetry_time = time_offset + time_scale * video_time (set by estimate_sync)
+        self.time_offset = None
+        self.time_scale = 1.0
 
+        self.frames = None
+        # Raw video frame index and presentation time (s) of every synced frame;
+        # kept apart from self.frames, which may be a cached array
+        self.frame_index = None
+        self.video_time = None
+        # MotionDetector curves of the last coarse-to-fine debug_detect_motion_video
+        self.motion_diagnostics = None
+        # Per-frame telemetry (set by analyze_telemetry); time axis = gps_time
+        self.track = None
+
+    # ---- synced signals (views into self.track) ----
+    def _column(self, name):
+        return None if self.track is None else self.track[name]
+
+    def _set_column(self, name, values):
+        if self.track is None:
+            raise RuntimeError("Frames not aligned yet; run analyze_telemetry first")
+        self.track[name] = values
+
+    @property
+    def gps_time(self):
+        return None if self.track is None else self.track.time
+
+    @property
+    def yaw(self):
+        return self._column("yaw")
+
+    @yaw.setter
+    def yaw(self, values):
+        self._set_column("yaw", values)
+
+    @property
+    def pitch(self):
+        return self._column("pitch")
+
+    @pitch.setter
+    def pitch(self, values):
+        self._set_column("pitch", values)
+
+    @property
+    def roll(self):
+        return self._column("roll")
+
+    @roll.setter
+    def roll(self, values):
+        self._set_column("roll", values)
+
+    @property
+    def gps_alt(self):
+        return self._column("gps_alt")
+
+    @gps_alt.setter
+    def gps_alt(self, values):
+        self._set_column("gps_alt", values)
+
+    MONITOR_TOPICS = [
+        "vehicle_attitude",
+        "sensor_accel",
+        "sensor_gyro",
+        "sensor_mag",
+        "sensor_baro",
+        "sensor_gps",
+        "vehicle_local_position",
+        "vehicle_global_position"
+    ]
+
+    def read_telemetry(self, fmt="npy"):
+        from pyulog import ULog
+
+        # Only the monitored topics are parsed out of the log
+        with profiler.span("ulog_parse"):
+            ulog = ULog(self.ulog_path, message_name_filter_list=self.MONITOR_TOPICS)
+        profiler.count("ulog_bytes", os.path.getsize(self.ulog_path))
+        os.makedirs(self.csv_path, exist_ok=True)
+        store = TelemetryStore(self.csv_path)
 
-    def read_telemetry(self):
-        ulog = ULog(self.ulog_path)
-
-        for d in ulog.data_list:
-            df = pd.DataFrame(d.data)
-            print(d.name)
+        for data in ulog.data_list:
+            filename = TelemetryStore.filename(data.name, data.multi_id)
 
-        MONITOR_CSV = [
-            "vehicle_attitude",
-            "sensor_accel_0.csv",
-            "sensor_gyro_0.csv",
-            "sensor_mag_0.csv",
-            "sensor_baro_0.csv",
-            "sensor_gps_0.csv",
-            "vehicle_local_position_0.csv",
-            "vehicle_global_position_0.csv"
-        ]
+            with profiler.span("telemetry_write", topic=filename, fmt=fmt):
+                if fmt == "npy":
+                    store.write(data.name, data.multi_id, data.data)
+                    print(f"Saved {filename}.npy")
+                    continue
 
-        for data in ulog.data_list:
-            if data.name in MONITOR_CSV:
+                import pandas as pd
                 df = pd.DataFrame(data.data)
 
                 # Convert PX4 timestamp to seconds
                 if "timestamp" in df.columns:
                     df["timestamp_s"] = df["timestamp"] * 1e-6
 
-                filename = f"{data.name}_{data.multi_id}.csv"
-                filepath = os.path.join(self.csv_path, filename)
+                filepath = os.path.join(self.csv_path, f"{filename}.csv")
                 df.to_csv(filepath, index=False)
-                print(f"Saved {filename}")
+                print(f"Saved {filename}.csv")
 
-    def save_video_to_arrays(self):
-        self.read_fps()
-        cap = cv2.VideoCapture(self.video_path)
-        frames = []
-        frame_idx = 0
-
-        # Get total frames for tqdm progress
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-        with tqdm(total=total_frames, desc="Reading frames") as pbar:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-
-                if frame_idx % self.save_every_n == 0:
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    frames.append(frame_rgb)
-
-                frame_idx += 1
-                pbar.update(1)
-
-        cap.release()
+    def open_video(self):
+        from utilities.VideoFrameSource import VideoFrameSource
+        source = VideoFrameSource(self.video_path, step=self.save_every_n, progress=True)
+        self.fps = source.fps
+        print("Video FPS:", self.fps)
+        return source
 
-        frames = np.array(frames)
+    def save_video_to_arrays(self):
+        source = self.open_video()
+        with profiler.span("video_to_arrays", workers=self.workers):
+            if self.frame_cache is not None:
+                frames = self.frame_cache.load(source, workers=self.workers)
+            else:
+                frames = source.to_array(workers=self.workers)
         print("Frames shape:", frames.shape)
         return frames
 
     def read_fps(self):
+        import cv2
         cap = cv2.VideoCapture(self.video_path)
         self.fps = cap.get(cv2.CAP_PROP_FPS)
         cap.release()
         print("Video FPS:", self.fps)
 
     def load_telemetry(self):
-        plotter = PX4CSVPlotter(self.csv_path)
-
-        all_data = plotter.plot_all(plot=False)
-
-        angles = all_data["att"]
-        gps = all_data["gps"]
-
-        gps_time, gps_lon, gps_lat, gps_alt = gps
-        gps_alt = np.array(gps_alt)
-
-        yaw_att = np.array(angles[0])
-        pitch_att = np.array(angles[1])
-        roll_att = np.array(angles[2])
-        time_att = np.array(angles[3])
-
-        roll_norm = (roll_att + 180) % 360 - 180
-        pitch_norm = (pitch_att + 180) % 360 - 180
-        yaw_norm = (yaw_att + 180) % 360 - 180
-
-        M = len(yaw_norm)
-        N = M
-
-        idx = np.linspace(0, M - 1, N).astype(int)
-
-        gps_time = np.arange(N)
-        yaw_norm = yaw_norm[idx]
-        pitch_norm = pitch_norm[idx]
-        roll_norm = roll_norm[idx]
-
-        old_len = len(gps_alt)
-
-        x_old = np.linspace(0, 1, old_len)
-        x_new = np.linspace(0, 1, N)
-
-        gps_alt = np.interp(x_new, x_old, gps_alt)
-
-        print(gps_alt.shape)
-        print(gps_time.shape)
-        print(yaw_norm.shape)
-        print(pitch_norm.shape)
-        print(roll_norm.shape)
-
-        return gps_time, yaw_norm, pitch_norm, roll_norm, gps_alt
+        """
+        Full-rate attitude with GPS altitude, on the attitude timestamps.
+
+        Returns a ``TelemetryTrack`` with ``yaw``, ``pitch``, ``roll`` and
+        ``gps_alt`` columns whose ``time`` is the PX4 clock in seconds.
+        """
+        with profiler.span("telemetry_load"):
+            att_time, q = self.load_attitude()
+            gps_time, gps_lon, gps_lat, gps_alt = self.telemetry.gps()
+
+        with profiler.span("align", samples=len(att_time)):
+            track = TelemetryTrack.empty(att_time, ["yaw", "pitch", "roll", "gps_alt"])
+            track["roll"], track["pitch"], track["yaw"] = PX4TelemetryReader.quat_to_euler(
+                q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+            )
+            track.wrap_angles("yaw", "pitch", "roll")
+            TelemetryAligner(track.time).interpolate(gps_time, gps_alt, out=track["gps_alt"])
+
+        print(track)
+        return track
+
+    def load_attitude(self):
+        time, q0, q1, q2, q3 = self.telemetry.attitude_quaternions()
+        return np.asarray(time, dtype=np.float64), np.column_stack([q0, q1, q2, q3])
+
+    def video_to_telemetry_time(self, video_time, att_time=None):
+        """
+        Map video presentation times (s) onto the PX4 clock.
+
+        The video window [video_start_time, video_end_time] is matched to the
+        attitude samples [telemetry_start_idx, telemetry_end_idx), i.e. a
+        linear map with an offset and a clock-rate scale. When
+        ``estimate_sync`` has run, its offset/scale are used instead.
+        """
+        if self.time_offset is not None:
+            return self.time_offset + self.time_scale * np.asarray(video_time)
+
+        t0 = att_time[self.telemetry_start_idx]
+        t1 = att_time[min(self.telemetry_end_idx, len(att_time)) - 1]
+        v0, v1 = video_time[0], video_time[-1]
+
+        scale = (t1 - t0) / (v1 - v0) if v1 > v0 else 1.0
+        offset = t0 - scale * v0
+        return offset + scale * video_time
+
+    def imu_activity(self, kind="gyro"):
+        """
+        IMU activity signal for sync: ``(time, magnitude)``.
+
+        ``kind`` is ``"gyro"`` (angular rate magnitude), ``"accel"`` (deviation
+        of the specific force magnitude from its median, i.e. gravity removed)
+        or ``"both"`` (the two normalized and summed on the gyro time axis).
+        """
+        if kind in ("gyro", "both"):
+            g_time, gx, gy, gz = self.telemetry.gyroscope()
+            gyro = np.sqrt(gx**2 + gy**2 + gz**2)
+        if kind in ("accel", "both"):
+            a_time, ax, ay, az = self.telemetry.accelerometer()
+            acc = np.sqrt(ax**2 + ay**2 + az**2)
+            acc = np.abs(acc - np.median(acc))
+
+        if kind == "gyro":
+            return g_time, gyro
+        if kind == "accel":
+            return a_time, acc
+        if kind == "both":
+            acc = TelemetryAligner(g_time).interpolate(a_time, acc)
+            return g_time, SyncEstimator.normalize(gyro) + SyncEstimator.normalize(acc)
+        raise ValueError(f"Unknown IMU signal: {kind}")
+
+    def estimate_sync(self, rate=20.0, kind="gyro", step=1, target_height=120, max_lag=None):
+        """
+        Estimate the video -> PX4 clock mapping without hand-tuned constants.
+
+        The video motion energy (on small gray frames, decoded by
+        ``self.workers`` processes) is cross-correlated with the IMU activity
+        signal; per-window offsets give the clock drift. Sets ``time_offset``
+        and ``time_scale`` and returns the estimator result.
+        """
+        import cv2
+        from utilities.VideoFrameSource import VideoFrameSource
+        from utilities.ParallelVideoDecoder import ParallelVideoDecoder
+
+        source = VideoFrameSource(
+            self.video_path,
+            step=step,
+            color=cv2.COLOR_BGR2GRAY,
+            target_height=target_height
+        )
+        self.fps = source.fps
+
+        with profiler.span("motion_energy", workers=self.workers):
+            if self.workers > 1:
+                motion = ParallelVideoDecoder(self.workers).motion_energy(source)
+            else:
+                motion = source.motion_energy()
+
+        # motion[i] is the change from frame i to frame i + 1
+        video_time = source.timestamps()[1:len(motion) + 1]
+        with profiler.span("telemetry_load"):
+            imu_time, imu_signal = self.imu_activity(kind)
+
+        with profiler.span("sync_estimate"):
+            result = SyncEstimator(rate=rate, max_lag=max_lag).estimate(
+                video_time, motion, imu_time, imu_signal
+            )
+        self.time_offset = result["offset"]
+        self.time_scale = result["scale"]
+
+        print("Sync offset (s):", self.time_offset)
+        print("Sync scale:", self.time_scale)
+        print("Sync score:", result["score"])
+        print("Sync drift fitted:", result["drift_fitted"], "residual (s):", result["residual"])
+        return result
+
+    def align_topics(self, topics=None):
+        """
+        Every column of every exported topic, resampled onto the frame times.
+
+        Requires ``analyze_telemetry`` to have run. Returns
+        ``{topic: {column: values}}``.
+        """
+        if self.gps_time is None:
+            raise RuntimeError("Frames not aligned yet; run analyze_telemetry first")
+
+        if topics is None:
+            topics = self.telemetry.topics()
+
+        sources = {}
+        with profiler.span("telemetry_load"):
+            for topic in topics:
+                data = self.telemetry.load_topic(topic)
+                time = data.pop("time")
+                data.pop("timestamp", None)
+                sources[topic] = (time, data)
+
+        with profiler.span("align", topics=len(sources)):
+            return TelemetryAligner(self.gps_time).align(sources)
 
     def analyze_telemetry(self):
-        gps_time, yaw_norm, pitch_norm, roll_norm, gps_alt = self.load_telemetry()
-
-        frames = self.save_video_to_arrays()
-        self.frames = frames[int(self.video_start_time * self.fps):int(self.video_end_time * self.fps)]
-
-        gps_time_cut = gps_time[self.telemetry_start_idx:self.telemetry_end_idx]
-        yaw_cut = yaw_norm[self.telemetry_start_idx:self.telemetry_end_idx]
-        pitch_cut = pitch_norm[self.telemetry_start_idx:self.telemetry_end_idx]
-        roll_cut = roll_norm[self.telemetry_start_idx:self.telemetry_end_idx]
-        gps_alt_cut = gps_alt[self.telemetry_start_idx:self.telemetry_end_idx]
-
-        m = len(self.frames)
-        n = m
-
-        idx = np.linspace(0, len(yaw_cut) - 1, n).astype(int)
-        old_len = len(gps_alt_cut)
-        x_old = np.linspace(0, 1, old_len)
-        x_new = np.linspace(0, 1, n)
+        with profiler.span("telemetry_load"):
+            att_time, q = self.load_attitude()
+            gps_time, gps_lon, gps_lat, gps_alt = self.telemetry.gps()
+
+        # Lazy window over the video; frames are decoded only when consumed
+        frames = self.open_video()
+        # Window bounds are raw frame numbers; the source steps by save_every_n
+        step = self.save_every_n
+        start = 0 if self.video_start_time is None else -(-int(self.video_start_time * self.fps) // step)
+        stop = None if self.video_end_time is None else -(-int(self.video_end_time * self.fps) // step)
+        window = self.frames = frames[start:stop]
+        if self.frame_cache is not None:
+            self.frames = self.frame_cache.load(window, workers=self.workers)
+
+        # Each frame's presentation timestamp (recorded by the cache decode, if any)
+        video_time = window.timestamps()
+        self.frame_index = np.asarray(window.indices)
+        self.video_time = video_time
+
+        # Every frame gets a PX4 timestamp; each topic is interpolated onto those
+        with profiler.span("align", frames=len(video_time)):
+            frame_time = self.video_to_telemetry_time(video_time, att_time)
+            aligner = TelemetryAligner(frame_time)
+
+            q_frames = aligner.slerp(att_time, q)
+            roll, pitch, yaw = PX4TelemetryReader.quat_to_euler(
+                q_frames[:, 0], q_frames[:, 1], q_frames[:, 2], q_frames[:, 3]
+            )
 
-        self.gps_time = gps_time_cut
-        self.gps_alt = np.interp(x_new, x_old, gps_alt_cut)
-        self.gps_time = np.arange(n)
-        self.yaw = yaw_cut[idx]
-        self.pitch = pitch_cut[idx]
-        self.roll = roll_cut[idx]
+            track = TelemetryTrack.empty(frame_time, ["yaw", "pitch", "roll", "gps_alt"])
+            track["roll"], track["pitch"], track["yaw"] = roll, pitch, yaw
+            aligner.interpolate(gps_time, gps_alt, out=track["gps_alt"])
+        self.track = track
 
         print("gps_time_cut:", self.gps_time.shape)
         print("yaw_cut:", self.yaw.shape)
@@ -185,48 +348,94 @@ class TelemetryVideoSync:
         print("gps_alt_cut:", self.gps_alt.shape)
         print("frames_cut:", self.frames.shape)
 
-    ## Debug
-    def debug_detect_motion_video(self, tresh_video=1, min_static_frames=2):
-        self.read_fps()
-        cap = cv2.VideoCapture(self.video_path)
-
+    def stabilized_frames(self, focal_length=30, tolerance=0.5, workers=None, queue_size=16):
+        """
+        Synchronized frames with roll/pitch removed (``PerspectiveStabilizer``).
 
-        prev_frame = None
-        motion = []
+        Homographies come from the aligned ``roll``, ``pitch`` and
+        ``gps_alt``; frames are streamed, so this works on the lazy source
+        as well as on cached arrays. Yielded frames are reused buffers.
+        """
+        from utilities.VideoFrameSource import VideoFrameSource
+        from utilities.PerspectiveStabilizer import PerspectiveStabilizer
 
-        frame_idx = 0
+        if self.gps_time is None:
+            raise RuntimeError("Frames not aligned yet; run analyze_telemetry first")
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        frames = self.frames
+        if isinstance(frames, VideoFrameSource):
+            frames = frames.prefetch(queue_size)
 
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-            if prev_frame is None:
-                prev_frame = gray
-                frame_idx += 1
-                continue
-
-            # compute difference
-            diff = cv2.absdiff(gray, prev_frame)
-            mean_diff = diff.mean()
-            motion.append(mean_diff)
+        stabilizer = PerspectiveStabilizer(
+            focal_length=focal_length,
+            tolerance=tolerance,
+            workers=workers or max(self.workers, 1)
+        )
+        yield from stabilizer.stabilize(frames, self.roll, self.pitch, self.gps_alt)
+        print("Stabilizer:", stabilizer.stats())
 
-            prev_frame = gray
-            frame_idx += 1
+    def export_dataset(self, out_dir, shard_size=1024, encoding="raw", extra=None):
+        """
+        Write the synchronized frames and telemetry as a sharded dataset.
 
-        cap.release()
+        Frames are streamed from the video into ``shard_size``-sample
+        shards (``encoding`` ``"raw"`` or an image extension such as
+        ``".jpg"``); read it back with ``DatasetReader``.
+        """
+        from utilities.DatasetWriter import DatasetWriter
 
-        motion = np.array(motion)
+        if self.gps_time is None:
+            raise RuntimeError("Frames not aligned yet; run analyze_telemetry first")
 
-        # --- Detect start ---
-        start_frame = np.argmax(motion > tresh_video)
+        with DatasetWriter(out_dir, shard_size=shard_size, encoding=encoding) as writer:
+            writer.add_flight(self, extra=extra)
+        return out_dir
 
-        # --- Detect end ---
-        # Find last index where motion exceeds threshold
-        last_motion = np.where(motion > tresh_video)[0]
-        end_frame = last_motion[-1] + min_static_frames if len(last_motion) else 0
+    ## Debug
+    def debug_detect_motion_video(self, tresh_video=1, min_static_frames=2, coarse_to_fine=True):
+        """
+        First/last moving frame of the whole video.
+
+        Returns ``(start_frame, end_frame, motion)``; ``motion[i]`` is the
+        energy between frames ``i`` and ``i + 1``. With ``coarse_to_fine``
+        only small strided frames plus the frames around the two transitions
+        are decoded: pairs that were never compared are NaN, and the
+        detector's ``{"coarse", "exact"}`` curves are kept in
+        ``motion_diagnostics``. Otherwise every frame is compared.
+        """
+        self.read_fps()
+        self.motion_diagnostics = None
+
+        if coarse_to_fine:
+            from utilities.MotionDetector import MotionDetector
+            detector = MotionDetector(self.video_path, tresh_video, min_static_frames)
+            start_frame, end_frame, curve = detector.detect()
+            self.motion_diagnostics = curve
+
+            motion = np.full(max(detector.frame_count - 1, 0), np.nan)
+            idx, energy = curve["exact"]
+            keep = idx < len(motion)
+            motion[idx[keep]] = energy[keep]
+        else:
+            import cv2
+            from utilities.VideoFrameSource import VideoFrameSource
+            from utilities.ParallelVideoDecoder import ParallelVideoDecoder
+
+            source = VideoFrameSource(self.video_path, color=cv2.COLOR_BGR2GRAY)
+
+            # Mean absolute difference between consecutive gray frames
+            if self.workers > 1:
+                motion = ParallelVideoDecoder(self.workers).motion_energy(source)
+            else:
+                motion = source.motion_energy()
+
+            # --- Detect start ---
+            start_frame = np.argmax(motion > tresh_video)
+
+            # --- Detect end ---
+            # Find last index where motion exceeds threshold
+            last_motion = np.where(motion > tresh_video)[0]
+            end_frame = last_motion[-1] + min_static_frames if len(last_motion) else 0
 
         end_time = end_frame / self.fps
         start_time = start_frame / self.fps
@@ -237,7 +446,29 @@ class TelemetryVideoSync:
         print("End time (s):", end_time)
         print("Duration (s):", end_time - start_time)
 
-    def play_telemetry_video(self, window_name="Telemetry Video"):
+        return start_frame, end_frame, motion
+
+    def overlay_texts(self, n):
+        for i in range(n):
+            yield (
+                f"Idx: {i} | "
+                f"Time: {self.gps_time[i]:.2f}s | "
+                f"Alt: {self.gps_alt[i]:.2f}m | "
+                f"Pitch: {self.pitch[i]:.2f} | "
+                f"Roll: {self.roll[i]:.2f}"
+            )
+
+    def overlay_frames(self, queue_size=16):
+        """
+        ``(frames, texts)`` for the synchronized window, frames in BGR.
+        Frames are ``save_every_n`` apart, so they play at ``fps / save_every_n``.
+
+        A lazy source is re-opened without its RGB conversion and decoded
+        ahead on a background thread; cached (RGB) arrays are converted
+        frame by frame.
+        """
+        import cv2
+        from utilities.VideoFrameSource import VideoFrameSource
 
         # ---- safety check ----
         if self.frames is None:
@@ -251,35 +482,37 @@ class TelemetryVideoSync:
             len(self.roll),
         )
 
-        t = 1.0 / self.fps
+        if isinstance(self.frames, VideoFrameSource):
+            source = self.frames[:n].with_color(None)
+            frames = source.prefetch(queue_size)
+        else:
+            frames = (cv2.cvtColor(frame, cv2.COLOR_RGB2BGR) for frame in self.frames[:n])
 
-        for i in range(n):
-            frame = self.frames[i].copy()
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        return frames, self.overlay_texts(n)
 
-            text = (
-                f"Idx: {i} | "
-                f"Time: {self.gps_time[i]:.2f}s | "
-                f"Alt: {self.gps_alt[i]:.2f}m | "
-                f"Pitch: {self.pitch[i]:.2f} | "
-                f"Roll: {self.roll[i]:.2f}"
-            )
+    def play_telemetry_video(self, window_name="Telemetry Video", realtime=True):
+        """
+        Show the synchronized frames with the telemetry overlay.
 
-            cv2.putText(
-                frame_bgr,
-                text,
-                (20, 40),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (0, 255, 0),
-                2
-            )
+        With ``realtime`` playback follows the video clock (late frames are
+        dropped); otherwise every frame is shown. Press ``q`` to stop.
+        """
+        from utilities.OverlayRenderer import OverlayRenderer
 
-            cv2.imshow(window_name, frame_bgr)
+        frames, texts = self.overlay_frames()
+        with profiler.span("play_video"):
+            OverlayRenderer(self.fps / self.save_every_n).play(frames, texts, window_name, realtime=realtime)
 
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
+    def export_telemetry_video(self, output_path, fourcc="mp4v", queue_size=16, show=False):
+        """
+        Write the synchronized frames with the telemetry overlay to a file.
 
-            cv2.waitKey(int(t * 1000))
+        Runs headless by default; ``show=True`` previews while writing.
+        """
+        from utilities.OverlayRenderer import OverlayRenderer
 
-        cv2.destroyAllWindows()
+        frames, texts = self.overlay_frames(queue_size)
+        with profiler.span("export_video"):
+            return OverlayRenderer(self.fps / self.save_every_n).export(
+                frames, texts, output_path, fourcc=fourcc, queue_size=queue_size, show=show
+            )
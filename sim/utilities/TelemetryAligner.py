@@ -0,0 +1,102 @@
+import numpy as np
+
+
+class TelemetryAligner:
+    """
+    Resample telemetry topics onto a fixed set of target timestamps.
+
+    ``target_time`` is usually the presentation time of every video frame
+    expressed on the PX4 clock (seconds). For each topic the bracketing
+    samples are found once with ``searchsorted`` and every column of the
+    topic is interpolated in one vectorized pass. Targets outside a topic's
+    time range are clamped to its first/last sample.
+    """
+
+    def __init__(self, target_time):
+        self.target_time = np.asarray(target_time, dtype=np.float64)
+
+    def _brackets(self, time):
+        time = np.asarray(time, dtype=np.float64)
+        if len(time) < 2:
+            idx = np.zeros(len(self.target_time), dtype=np.intp)
+            return idx, idx, np.zeros(len(self.target_time))
+
+        hi = np.searchsorted(time, self.target_time, side="right")
+        hi = np.clip(hi, 1, len(time) - 1)
+        lo = hi - 1
+
+        span = time[hi] - time[lo]
+        w = np.divide(self.target_time - time[lo], span, out=np.zeros_like(span), where=span > 0)
+        np.clip(w, 0.0, 1.0, out=w)
+        return lo, hi, w
+
+    def interpolate(self, time, values, out=None):
+        """
+        Linear interpolation of ``values`` (shape ``(n,)`` or ``(n, k)``) sampled at ``time``.
+
+        ``out`` receives the result in place (e.g. a ``TelemetryTrack`` column).
+        """
+        values = np.asarray(values)
+        lo, hi, w = self._brackets(time)
+        if values.ndim > 1:
+            w = w[:, None]
+
+        start = values[lo]
+        step = values[hi] - start
+        step *= w
+        return np.add(start, step, out=out, casting="unsafe")
+
+    def interpolate_angles(self, time, angles):
+        """Interpolate angles in degrees along the shortest arc, result wrapped to [-180, 180)."""
+        angles = np.asarray(angles, dtype=np.float64)
+        lo, hi, w = self._brackets(time)
+        if angles.ndim > 1:
+            w = w[:, None]
+
+        delta = (angles[hi] - angles[lo] + 180) % 360 - 180
+        return (angles[lo] + w * delta + 180) % 360 - 180
+
+    def slerp(self, time, quaternions):
+        """Spherical interpolation of unit quaternions, shape ``(n, 4)`` in PX4 ``q[0..3]`` order."""
+        q = np.asarray(quaternions, dtype=np.float64)
+        lo, hi, w = self._brackets(time)
+        q0 = q[lo]
+        q1 = q[hi]
+
+        # q and -q are the same rotation: take the short way round
+        dot = np.einsum("ij,ij->i", q0, q1)
+        q1 = np.where(dot[:, None] < 0, -q1, q1)
+        dot = np.clip(np.abs(dot), 0.0, 1.0)
+
+        theta = np.arccos(dot)
+        sin_theta = np.sin(theta)
+        small = sin_theta < 1e-6
+
+        a = np.divide(np.sin((1 - w) * theta), sin_theta, out=1 - w, where=~small)
+        b = np.divide(np.sin(w * theta), sin_theta, out=w.copy(), where=~small)
+
+        out = a[:, None] * q0 + b[:, None] * q1
+        out /= np.linalg.norm(out, axis=1, keepdims=True)
+        return out
+
+    def align(self, topics):
+        """
+        Align several topics at once.
+
+        ``topics`` maps a name to ``(time, columns)`` where ``columns`` is a
+        dict of 1-D arrays sharing that time axis. Returns the same structure
+        (without the time axis) resampled onto ``target_time``.
+        """
+        aligned = {}
+        for name, (time, columns) in topics.items():
+            lo, hi, w = self._brackets(time)
+            names = list(columns)
+            if not names:
+                aligned[name] = {}
+                continue
+
+            stacked = np.column_stack([np.asarray(columns[c], dtype=np.float64) for c in names])
+            values = stacked[lo] + w[:, None] * (stacked[hi] - stacked[lo])
+            aligned[name] = {c: values[:, i] for i, c in enumerate(names)}
+
+        return aligned
@@ -0,0 +1,57 @@
+import os
+import numpy as np
+
+
+class TelemetryStore:
+    """
+    Binary columnar store for ULog topics.
+
+    Every topic instance is written as one ``<topic>_<multi_id>.npy`` file
+    holding a structured array with the ULog field names and native dtypes,
+    so nothing is lost to text formatting and files can be memory-mapped.
+    Reading a column from a mapped file is a zero-copy strided view.
+    """
+
+    SUFFIX = ".npy"
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+
+    @staticmethod
+    def filename(name, multi_id):
+        return f"{name}_{multi_id}"
+
+    def path(self, topic):
+        topic = os.path.splitext(topic)[0]
+        return os.path.join(self.store_dir, topic + self.SUFFIX)
+
+    def exists(self, topic):
+        return os.path.exists(self.path(topic))
+
+    def topics(self):
+        return sorted(
+            os.path.splitext(name)[0]
+            for name in os.listdir(self.store_dir)
+            if name.endswith(self.SUFFIX)
+        )
+
+    def write(self, name, multi_id, data):
+        """Write one topic instance; ``data`` maps field name -> 1-D array (ULog ``Data.data``)."""
+        fields = list(data.keys())
+        n = len(data[fields[0]]) if fields else 0
+
+        table = np.empty(n, dtype=[(f, np.asarray(data[f]).dtype) for f in fields])
+        for f in fields:
+            table[f] = data[f]
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        topic = self.filename(name, multi_id)
+        np.save(self.path(topic), table)
+        return topic
+
+    def read(self, topic, mmap=True):
+        """Structured array for ``topic`` (``"sensor_accel_0"`` or ``"sensor_accel_0.csv"``)."""
+        path = self.path(topic)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Topic not found: {path}")
+        return np.load(path, mmap_mode="r" if mmap else None)
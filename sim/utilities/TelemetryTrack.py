@@ -0,0 +1,98 @@
+import numpy as np
+
+
+class TelemetryTrack:
+    """
+    Several telemetry signals on one shared time axis, in one buffer.
+
+    ``time`` is float64 (PX4 seconds need the precision); the signals live
+    in a single ``(columns, n)`` array of ``dtype`` (float32 by default), so
+    every column is a contiguous row of the same allocation. Columns are
+    returned as views, and slicing by index or time returns a new track
+    over the same memory - nothing is copied. ``wrap_angles`` normalizes
+    in place.
+    """
+
+    __slots__ = ("time", "data", "columns")
+
+    def __init__(self, time, data, columns):
+        self.time = time
+        self.data = data
+        self.columns = {name: i for i, name in enumerate(columns)}
+
+    # ---- construction ----
+    @classmethod
+    def empty(cls, time, columns, dtype=np.float32):
+        """Allocate a track to be filled column by column (``track[name][:] = ...``)."""
+        time = np.ascontiguousarray(time, dtype=np.float64)
+        return cls(time, np.empty((len(columns), len(time)), dtype=dtype), list(columns))
+
+    @classmethod
+    def from_columns(cls, time, columns, dtype=np.float32):
+        """Build a track from ``{name: values}`` (values are cast into the shared buffer)."""
+        track = cls.empty(time, list(columns), dtype)
+        for name, values in columns.items():
+            track[name][:] = values
+        return track
+
+    # ---- access ----
+    def __len__(self):
+        return len(self.time)
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __getitem__(self, name):
+        return self.data[self.columns[name]]
+
+    def __setitem__(self, name, values):
+        self.data[self.columns[name]][:] = values
+
+    def __getattr__(self, name):
+        # Only called for names that are not slots: expose columns as attributes
+        try:
+            return self.data[object.__getattribute__(self, "columns")[name]]
+        except (KeyError, AttributeError):
+            raise AttributeError(name) from None
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    @property
+    def nbytes(self):
+        return self.time.nbytes + self.data.nbytes
+
+    def to_dict(self):
+        return dict({"time": self.time}, **{name: self[name] for name in self.columns})
+
+    def __repr__(self):
+        return f"TelemetryTrack({len(self)} samples, columns={list(self.columns)}, dtype={self.dtype})"
+
+    # ---- slicing ----
+    def _view(self, index):
+        view = object.__new__(TelemetryTrack)
+        view.time = self.time[index]
+        view.data = self.data[:, index]
+        view.columns = self.columns
+        return view
+
+    def slice(self, start=None, stop=None, step=None):
+        """Samples ``[start:stop:step]`` as a view."""
+        return self._view(slice(start, stop, step))
+
+    def between(self, t_start=None, t_stop=None):
+        """Samples with ``t_start <= time <= t_stop`` as a view (``time`` is sorted)."""
+        lo = 0 if t_start is None else int(np.searchsorted(self.time, t_start, side="left"))
+        hi = len(self.time) if t_stop is None else int(np.searchsorted(self.time, t_stop, side="right"))
+        return self._view(slice(lo, hi))
+
+    # ---- normalization ----
+    def wrap_angles(self, *names):
+        """Wrap columns (degrees) to [-180, 180) in place."""
+        for name in names:
+            column = self[name]
+            np.add(column, 180, out=column)
+            np.remainder(column, 360, out=column)
+            np.subtract(column, 180, out=column)
+        return self
@@ -0,0 +1,380 @@
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+from utilities.Profiler import profiler
+
+
+class VideoFrameSource:
+    """
+    Lazy, index-addressable view over the frames of a video file.
+
+    Frames are decoded on demand, so iterating a source (or a slice of it)
+    never holds more than one frame - or one chunk - in memory. Slicing
+    returns another source over the same file without decoding anything.
+    """
+
+    def __init__(
+        self,
+        video_path,
+        step=1,
+        color=cv2.COLOR_BGR2RGB,
+        target_height=None,
+        cut_pixels=0,
+        progress=False
+    ):
+        self.video_path = video_path
+        self.step = step
+        self.color = color
+        self.target_height = target_height
+        self.cut_pixels = cut_pixels
+        self.progress = progress
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise FileNotFoundError(f"Cannot open video: {video_path}")
+        self.fps = cap.get(cv2.CAP_PROP_FPS)
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+
+        # Raw (file) frame indices covered by this source
+        self._indices = range(0, self.frame_count, step)
+
+        # Raw frame index -> presentation time (s), recorded whenever a frame
+        # is decoded (NaN past the end of the stream); shared with every view
+        self.frame_pts = {}
+
+        self._cap = None
+        self._next_raw = None
+
+    # ---- sequence protocol ----
+    def __len__(self):
+        return len(self._indices)
+
+    @property
+    def frame_shape(self):
+        h, w = self.height, self.width
+        if self.target_height is not None:
+            w = int(w * (self.target_height / h))
+            h = self.target_height
+        w -= self.cut_pixels
+
+        channels = () if self.color == cv2.COLOR_BGR2GRAY else (3,)
+        return (h, w) + channels
+
+    @property
+    def shape(self):
+        return (len(self),) + self.frame_shape
+
+    def timestamps(self):
+        """
+        Presentation time (seconds from the start of the file) of every frame.
+
+        These are the decoder's per-frame timestamps (``CAP_PROP_POS_MSEC``),
+        so variable-frame-rate files get their real times. Frames that were
+        never decoded are scanned with ``grab`` only (no conversion). Slots
+        past the end of the stream, or a backend without usable timestamps,
+        fall back to ``index / fps``.
+        """
+        nominal = np.asarray(self._indices, dtype=np.float64) / self.fps
+        missing = [i for i in self._indices if i not in self.frame_pts]
+        if missing:
+            self._scan_timestamps(missing[0], missing[-1] + 1)
+
+        times = np.array([self.frame_pts.get(i, np.nan) for i in self._indices], dtype=np.float64)
+        unknown = np.isnan(times)
+        times[unknown] = nominal[unknown]
+        if len(times) > 1 and np.any(np.diff(times) <= 0):
+            return nominal
+        return times
+
+    def cache_params(self):
+        """Everything besides the file itself that determines the decoded pixels."""
+        return {
+            "start": self._indices.start,
+            "stop": self._indices.stop,
+            "step": self._indices.step,
+            "target_height": self.target_height,
+            "cut_pixels": self.cut_pixels,
+            "color": self.color,
+        }
+
+    @property
+    def indices(self):
+        return self._indices
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._view(self._indices[key])
+
+        return self._read_at(self._indices[key])
+
+    def __iter__(self):
+        return self.iter_frames()
+
+    def select(self, indices):
+        """View over an explicit ``range`` of raw frame indices, same preprocessing."""
+        return self._view(indices)
+
+    def with_color(self, color):
+        """Same frames with another color conversion (``None`` keeps OpenCV's BGR)."""
+        return self._view(self._indices, color=color)
+
+    def _view(self, indices, **overrides):
+        view = object.__new__(VideoFrameSource)
+        view.__dict__.update(self.__dict__)
+        view.__dict__.update(overrides)
+        view._indices = indices
+        view._cap = None
+        view._next_raw = None
+        return view
+
+    # ---- decoding ----
+    def _convert(self, frame):
+        if self.target_height is not None:
+            h, w = frame.shape[:2]
+            scale = self.target_height / h
+            new_width = int(w * scale)
+            with profiler.span("resize"):
+                frame = cv2.resize(frame, (new_width, self.target_height), interpolation=cv2.INTER_AREA)
+
+        if self.cut_pixels:
+            frame = frame[:, self.cut_pixels:]
+
+        if self.color is not None:
+            with profiler.span("color_convert"):
+                frame = cv2.cvtColor(frame, self.color)
+        return frame
+
+    def _record(self, cap, raw_idx):
+        self.frame_pts[raw_idx] = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+    def _mark_end(self, raw_start, raw_stop):
+        # The stream ended early: container frame counts are estimates
+        for i in range(raw_start, raw_stop):
+            self.frame_pts.setdefault(i, np.nan)
+
+    def _scan_timestamps(self, raw_start, raw_stop):
+        """Record the timestamps of frames [raw_start, raw_stop) without converting them."""
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            with profiler.span("pts_scan", frames=raw_stop - raw_start):
+                raw_idx, grabbed = self._seek(cap, raw_start) if raw_start > 0 else (0, False)
+                if grabbed:
+                    raw_idx += 1
+                while raw_idx < raw_stop:
+                    if not cap.grab():
+                        self._mark_end(raw_idx, raw_stop)
+                        return
+                    self._record(cap, raw_idx)
+                    raw_idx += 1
+        finally:
+            cap.release()
+
+    @staticmethod
+    def _decode(cap, grabbed=False):
+        with profiler.span("decode"):
+            ret, frame = cap.retrieve() if grabbed else cap.read()
+        if ret:
+            profiler.count("frames_decoded")
+            profiler.count("bytes_decoded", frame.nbytes)
+        return ret, frame
+
+    def _seek(self, cap, raw_idx):
+        """
+        Position ``cap`` at frame ``raw_idx``; returns ``(pos, grabbed)``.
+
+        The decoder jumps to the nearest keyframe before the target and
+        decodes forward from there. The landed frame is grabbed and its
+        timestamp (``CAP_PROP_POS_MSEC``) compared with the one recorded for
+        ``raw_idx`` (``raw_idx / fps`` if none is): on a match it is left
+        grabbed (``(raw_idx, True)``, retrieve it next). Otherwise - inexact
+        seeks, variable frame rate without recorded times - reading restarts
+        from the beginning (``(0, False)``) so frame indices never drift.
+        """
+        cap.set(cv2.CAP_PROP_POS_FRAMES, raw_idx)
+        if cap.grab():
+            if not self.fps:
+                self._record(cap, raw_idx)
+                return raw_idx, True
+            expected = self.frame_pts.get(raw_idx, np.nan)
+            if np.isnan(expected):
+                expected = raw_idx / self.fps
+            error_ms = abs(cap.get(cv2.CAP_PROP_POS_MSEC) - expected * 1000.0)
+            if error_ms < 500.0 / self.fps:
+                self._record(cap, raw_idx)
+                return raw_idx, True
+
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return 0, False
+
+    def iter_frames(self):
+        """Yield frames in order, decoding only the requested window."""
+        from tqdm import tqdm
+
+        indices = self._indices
+        if len(indices) == 0:
+            return
+
+        cap = cv2.VideoCapture(self.video_path)
+        raw_idx, grabbed = self._seek(cap, indices[0]) if indices[0] > 0 else (0, False)
+
+        # Frames we never touch: everything before the seek point and after the window
+        decoded = indices[-1] + 1 - raw_idx
+        skipped = max(self.frame_count - decoded, 0)
+        pbar = tqdm(total=len(indices), desc="Reading frames", disable=not self.progress)
+        if skipped:
+            pbar.set_postfix(
+                skipped=f"{skipped} ({skipped / max(self.frame_count, 1):.0%})",
+                speedup=f"{self.frame_count / max(decoded, 1):.2f}x"
+            )
+
+        try:
+            for target in indices:
+                # Skip frames outside the stride without converting them
+                while raw_idx < target:
+                    if not cap.grab():
+                        self._mark_end(raw_idx, indices[-1] + 1)
+                        return
+                    self._record(cap, raw_idx)
+                    raw_idx += 1
+
+                ret, frame = self._decode(cap, grabbed)
+                grabbed = False
+                if not ret:
+                    self._mark_end(raw_idx, indices[-1] + 1)
+                    return
+                self._record(cap, raw_idx)
+                raw_idx += 1
+                pbar.update(1)
+
+                yield self._convert(frame)
+        finally:
+            pbar.close()
+            cap.release()
+
+    def prefetch(self, queue_size=8):
+        """
+        Iterate frames while a background thread decodes ahead.
+
+        At most ``queue_size`` decoded frames wait in the queue, so decoding
+        overlaps with whatever the consumer does without growing memory.
+        OpenCV releases the GIL while decoding and converting.
+        """
+        frames = queue.Queue(maxsize=max(queue_size, 1))
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def worker():
+            try:
+                for frame in self.iter_frames():
+                    if not put(frame):
+                        return
+            except Exception as exc:
+                put(exc)
+            finally:
+                put(done)
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = frames.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            thread.join()
+
+    def iter_chunks(self, chunk_size=64):
+        """Yield consecutive frames stacked into arrays of at most ``chunk_size``."""
+        chunk = []
+        for frame in self.iter_frames():
+            chunk.append(frame)
+            if len(chunk) == chunk_size:
+                yield np.stack(chunk)
+                chunk = []
+
+        if chunk:
+            yield np.stack(chunk)
+
+    def _read_at(self, raw_idx):
+        # Random access keeps one capture open, so reading neighbouring
+        # indices in order does not re-seek every time
+        if self._cap is None:
+            self._cap = cv2.VideoCapture(self.video_path)
+            self._next_raw = 0
+
+        grabbed = False
+        if raw_idx != self._next_raw:
+            self._next_raw, grabbed = self._seek(self._cap, raw_idx)
+            while self._next_raw < raw_idx:
+                if not self._cap.grab():
+                    raise IndexError(f"Frame {raw_idx} could not be decoded")
+                self._record(self._cap, self._next_raw)
+                self._next_raw += 1
+
+        ret, frame = self._decode(self._cap, grabbed)
+        if not ret:
+            raise IndexError(f"Frame {raw_idx} could not be decoded")
+        self._record(self._cap, raw_idx)
+        self._next_raw = raw_idx + 1
+
+        return self._convert(frame)
+
+    def motion_energy(self):
+        """Mean absolute difference between each pair of consecutive frames."""
+        motion = []
+        prev = None
+        for frame in self.iter_frames():
+            if prev is not None:
+                motion.append(cv2.absdiff(frame, prev).mean())
+            prev = frame
+
+        return np.array(motion)
+
+    def to_array(self, workers=1):
+        """Decode every frame straight into one preallocated array (a file-backed memmap with workers)."""
+        if workers > 1:
+            from utilities.ParallelVideoDecoder import ParallelVideoDecoder
+            return ParallelVideoDecoder(workers).decode(self)
+
+        frames = np.empty(self.shape, dtype=np.uint8)
+        n = 0
+        for frame in self.iter_frames():
+            frames[n] = frame
+            n += 1
+
+        # Container frame counts are estimates; drop slots that never filled
+        return frames[:n] if n < len(frames) else frames
+
+    def close(self):
+        if getattr(self, "_cap", None) is not None:
+            self._cap.release()
+            self._cap = None
+            self._next_raw = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        self.close()